@@ -0,0 +1,64 @@
+"""
+Async cart API for the Enhanced Telegram Cafe Bot
+Lets handlers await any cart backend without blocking the event loop
+"""
+
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from enhanced_config import CART_QUEUE_SIZE, CART_REDIS_POOL_SIZE
+from offload import BoundedExecutor
+
+T = TypeVar("T")
+
+
+class AsyncCartManager:
+    """Awaitable front of a cart backend (see enhanced_cart_manager.BaseCartManager)
+
+    Backends marked ``blocking`` (e.g. RedisCartManager, which waits on the
+    network) run on a dedicated pool of ``workers`` threads, one per pooled
+    connection, so a slow or unreachable server only delays the users
+    waiting on it. In-process backends are called directly: their calls
+    are cheap and their state is not thread-safe.
+    """
+
+    def __init__(self, manager: Any, workers: int = CART_REDIS_POOL_SIZE,
+                 queue_size: int = CART_QUEUE_SIZE):
+        self.manager = manager
+        self._executor: Optional[BoundedExecutor] = (
+            BoundedExecutor(workers, queue_size, "carts") if manager.blocking else None
+        )
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        if self._executor is None:
+            return function(*args)
+        return await self._executor.run(function, *args)
+
+    async def get_cart(self, owner: Hashable) -> Any:
+        """Get a cart; it must not be modified"""
+        return await self._run(self.manager.get_cart, owner)
+
+    async def add_item(self, owner: Hashable, item_id: str, quantity: int = 1) -> bool:
+        """Add item to a cart; a negative quantity takes it away"""
+        return await self._run(self.manager.add_item, owner, item_id, quantity)
+
+    async def remove_item(self, owner: Hashable, item_id: str) -> bool:
+        """Remove item from a cart"""
+        return await self._run(self.manager.remove_item, owner, item_id)
+
+    async def update_quantity(self, owner: Hashable, item_id: str, quantity: int) -> bool:
+        """Update item quantity in a cart"""
+        return await self._run(self.manager.update_quantity, owner, item_id, quantity)
+
+    async def get_item_quantity(self, owner: Hashable, item_id: str) -> int:
+        """Get quantity of specific item in a cart"""
+        return await self._run(self.manager.get_item_quantity, owner, item_id)
+
+    async def clear_cart(self, owner: Hashable) -> bool:
+        """Clear a cart"""
+        return await self._run(self.manager.clear_cart, owner)
+
+    def close(self) -> None:
+        """Finish the calls in flight and close the backend"""
+        if self._executor is not None:
+            self._executor.close()
+        self.manager.close()
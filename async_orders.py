@@ -0,0 +1,41 @@
+"""
+Async order API for the Enhanced Telegram Cafe Bot
+Runs order storage on worker threads so handlers never block the event loop
+"""
+
+from typing import Any, Dict, Optional
+
+from enhanced_config import ORDER_QUEUE_SIZE, ORDER_WORKERS
+from offload import BoundedExecutor
+
+
+class AsyncOrderManager:
+    """Awaitable front of an order backend (OrderManager or SQLiteOrderManager)
+
+    Calls run on a dedicated pool of ``workers`` threads, so a slow disk
+    only delays orders, never menu browsing. At most ``queue_size`` calls
+    are in flight; further callers wait for a slot instead of queueing
+    without bound. Several concurrent writes also let the log backend share
+    one fsync between them.
+    """
+
+    def __init__(self, manager: Any, workers: int = ORDER_WORKERS, queue_size: int = ORDER_QUEUE_SIZE):
+        self.manager = manager
+        self._executor = BoundedExecutor(workers, queue_size, "orders")
+
+    async def create_order(self, order_data: Dict[str, Any]) -> Optional[str]:
+        """Create a new order, returning its ID or None"""
+        return await self._executor.run(self.manager.create_order, order_data)
+
+    async def get_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Get order by ID"""
+        return await self._executor.run(self.manager.get_order, order_id)
+
+    async def update_order_status(self, order_id: str, status: str) -> bool:
+        """Update order status"""
+        return await self._executor.run(self.manager.update_order_status, order_id, status)
+
+    def close(self) -> None:
+        """Finish the calls in flight and close the backend"""
+        self._executor.close()
+        self.manager.close()
@@ -0,0 +1,250 @@
+"""
+Compiled binary snapshot of the menu catalog
+A compact, memory-mapped file generated from the menu JSON so the bot can
+load large menus without parsing JSON
+
+Usage: python catalog_snapshot.py [menu_data.json]
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, List, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CAFEMENU"
+FORMAT_VERSION = 1
+SNAPSHOT_SUFFIX = ".catalog"
+
+LAYOUT_NESTED = 0
+LAYOUT_FLAT = 1
+
+# magic, format version, layout, source mtime_ns, source size,
+# string count, string table size, category count, item count,
+# value count, shapes (string index), top-level extras (string index)
+_HEADER = struct.Struct("<8sHHqqIIIIIII")
+# key, metadata JSON (string indexes), first item, item count
+_CATEGORY = struct.Struct("<IIII")
+# id (string index), shape, first value, price in cents
+_ITEM = struct.Struct("<IIIq")
+
+MISSING = 0xFFFFFFFF
+# Strings are stored as one UTF-8 blob joined by this separator, so the
+# whole table decodes with a single decode() and split()
+SEPARATOR = "\x00"
+
+
+def snapshot_path(menu_path: str) -> str:
+    """Get the snapshot file path of a menu JSON file"""
+    return os.path.splitext(menu_path)[0] + SNAPSHOT_SUFFIX
+
+
+class _StringTable:
+    """Interns strings so every distinct value is stored once"""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, text: str) -> int:
+        position = self.index.get(text)
+        if position is None:
+            if SEPARATOR in text:
+                raise ValueError("menu strings must not contain NUL characters")
+            position = len(self.strings)
+            self.index[text] = position
+            self.strings.append(text)
+        return position
+
+
+def write_snapshot(data: Dict[str, Any], path: str, signature: Tuple[int, int],
+                   categories: Dict[str, Dict[str, Any]], prices: Dict[str, int]) -> None:
+    """Compile normalized menu data into a snapshot file
+
+    Items are stored by shape: the ordered keys of an item (and which of
+    its values are not plain strings) are kept once per shape, and each
+    item only stores string indexes for its values. The file is written
+    to a temp file of its own next to its final path, synced, and renamed
+    into place, so readers never see a partial snapshot, even when several
+    processes compile the same menu at once.
+    """
+    strings = _StringTable()
+    nested = isinstance(data.get("categories"), dict)
+
+    if nested:
+        extras = {key: value for key, value in data.items() if key != "categories"}
+    else:
+        extras = {key: value for key, value in data.items() if key not in categories}
+
+    shapes: Dict[Tuple, int] = {}
+    category_rows = []
+    item_rows = []
+    values = array("I")
+    for category_key, category in categories.items():
+        items = category.get("items", [])
+        meta = {key: value for key, value in category.items() if key != "items"} if nested else {}
+        category_rows.append(_CATEGORY.pack(
+            strings.add(category_key),
+            strings.add(json.dumps(meta, ensure_ascii=False)),
+            len(item_rows),
+            len(items)
+        ))
+        for item in items:
+            shape = tuple((key, not isinstance(value, str)) for key, value in item.items())
+            shape_index = shapes.setdefault(shape, len(shapes))
+            first_value = len(values)
+            for value in item.values():
+                if not isinstance(value, str):
+                    value = json.dumps(value, ensure_ascii=False)
+                values.append(strings.add(value))
+
+            item_id = item.get("id")
+            if isinstance(item_id, str):
+                item_rows.append(_ITEM.pack(
+                    strings.add(item_id), shape_index, first_value, prices.get(item_id, 0)
+                ))
+            else:
+                item_rows.append(_ITEM.pack(MISSING, shape_index, first_value, 0))
+
+    shapes_index = strings.add(json.dumps([list(shape) for shape in shapes], ensure_ascii=False))
+    extras_index = strings.add(json.dumps(extras, ensure_ascii=False))
+    table = SEPARATOR.join(strings.strings).encode("utf-8")
+    if sys.byteorder != "little":
+        values.byteswap()
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, LAYOUT_NESTED if nested else LAYOUT_FLAT,
+        signature[0], signature[1],
+        len(strings.strings), len(table),
+        len(category_rows), len(item_rows), len(values),
+        shapes_index, extras_index
+    )
+
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(header)
+            file.write(table)
+            file.write(b"".join(category_rows))
+            file.write(b"".join(item_rows))
+            file.write(values.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    logger.info(f"Wrote menu snapshot {path} ({len(item_rows)} items, {len(strings.strings)} strings)")
+
+
+def read_snapshot(path: str, signature: Tuple[int, int]) -> Optional[Tuple[Dict[str, Any], Dict[str, int]]]:
+    """Load (data, prices) from a snapshot, or None if it is missing or stale
+
+    ``signature`` is the (mtime_ns, size) of the menu JSON; a snapshot
+    compiled from a different version of the file is ignored.
+    """
+    try:
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                return _decode(view, signature)
+    except FileNotFoundError:
+        return None
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        logger.warning(f"Ignoring unreadable menu snapshot {path}: {e}")
+        return None
+
+
+def _decode(view, signature) -> Optional[Tuple[Dict[str, Any], Dict[str, int]]]:
+    """Decode a mapped snapshot file"""
+    (magic, version, layout, mtime_ns, size, string_count, table_size,
+     category_count, item_count, value_count, shapes_index, extras_index) = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a menu snapshot of this format")
+    if (mtime_ns, size) != tuple(signature):
+        return None
+    expected = (_HEADER.size + table_size + category_count * _CATEGORY.size
+                + item_count * _ITEM.size + value_count * array("I").itemsize)
+    if len(view) != expected:
+        raise ValueError(f"snapshot is {len(view)} bytes, its header describes {expected}")
+
+    position = _HEADER.size
+    # Decode each distinct string once; every record shares the same objects
+    strings = view[position:position + table_size].decode("utf-8").split(SEPARATOR)
+    position += table_size
+    if len(strings) != string_count:
+        raise ValueError("corrupt string table")
+
+    categories = list(_CATEGORY.iter_unpack(view[position:position + category_count * _CATEGORY.size]))
+    position += category_count * _CATEGORY.size
+    items = list(_ITEM.iter_unpack(view[position:position + item_count * _ITEM.size]))
+    position += item_count * _ITEM.size
+    value_indexes = array("I")
+    value_indexes.frombytes(view[position:position + value_count * value_indexes.itemsize])
+    if sys.byteorder != "little":
+        value_indexes.byteswap()
+    values = [strings[index] for index in value_indexes]
+
+    shapes = []
+    for shape in json.loads(strings[shapes_index]):
+        keys = tuple(key for key, _ in shape)
+        encoded = tuple(key for key, is_json in shape if is_json)
+        shapes.append((keys, len(keys), encoded))
+
+    data = json.loads(strings[extras_index])
+    nested_categories = {}
+    prices: Dict[str, int] = {}
+    for key_index, meta_index, first_item, count in categories:
+        if first_item + count > item_count:
+            raise ValueError("category items out of range")
+        category_items = []
+        for id_index, shape_index, first_value, price_cents in items[first_item:first_item + count]:
+            keys, width, encoded = shapes[shape_index]
+            if first_value + width > value_count:
+                raise ValueError("item values out of range")
+            item = dict(zip(keys, values[first_value:first_value + width]))
+            for key in encoded:
+                item[key] = json.loads(item[key])
+            if id_index != MISSING:
+                prices.setdefault(strings[id_index], price_cents)
+            category_items.append(item)
+
+        category_key = strings[key_index]
+        if layout == LAYOUT_NESTED:
+            category = json.loads(strings[meta_index])
+            category["items"] = category_items
+            nested_categories[category_key] = category
+        else:
+            data[category_key] = category_items
+
+    if layout == LAYOUT_NESTED:
+        data["categories"] = nested_categories
+    return data, prices
+
+
+def main(argv: List[str]) -> int:
+    """Compile a menu JSON file into its snapshot"""
+    from menu_catalog import MenuSnapshot
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    menu_path = argv[1] if len(argv) > 1 else "menu_data.json"
+    stat = os.stat(menu_path)
+    with open(menu_path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    menu = MenuSnapshot(data, 0)
+    write_snapshot(data, snapshot_path(menu_path), (stat.st_mtime_ns, stat.st_size),
+                   menu.categories, menu.prices)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -40,6 +40,9 @@ CAFE_INSTAGRAM = "@artisancafe"
 ORDER_PHONE = "+1 (555) 123-ORDER"
 ORDER_EMAIL = "orders@artisancafe.com"
 
+# Menu Settings
+CATEGORY_PAGE_SIZE = 8  # items per page of a category keyboard
+
 # Bot Messages
 WELCOME_MESSAGE = f"""
 🎉 {CAFE_NAME} 🎉
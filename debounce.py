@@ -0,0 +1,64 @@
+"""
+Debouncing of rapid-fire actions for the Enhanced Telegram Cafe Bot
+Used to coalesce message re-renders when users tap buttons quickly
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class Debouncer:
+    """Runs only the last of a burst of actions per key
+
+    ``schedule(key, action)`` runs ``action()`` once ``delay`` seconds pass
+    without another action being scheduled for the same key; superseded
+    actions are dropped without running. Actions of one key never overlap,
+    so an older render can't land after a newer one. Other writers of the
+    same target call ``cancel(key)`` first, so a pending action can't land
+    after them either.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.dropped = 0
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self._running: Dict[Hashable, asyncio.Task] = {}
+
+    def schedule(self, key: Hashable, action: Callable[[], Awaitable[None]]) -> None:
+        """Replace the pending action of a key; must run on the event loop"""
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.cancel()
+            self.dropped += 1
+        self._pending[key] = asyncio.create_task(self._run(key, action))
+
+    async def cancel(self, key: Hashable) -> None:
+        """Drop the pending action of a key and wait for a running one to finish"""
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            pending.cancel()
+            self.dropped += 1
+        running = self._running.get(key)
+        if running is not None:
+            await asyncio.wait((running,))
+
+    async def _run(self, key: Hashable, action: Callable[[], Awaitable[None]]) -> None:
+        await asyncio.sleep(self.delay)
+
+        # From here on the action can't be superseded, only followed
+        task = asyncio.current_task()
+        del self._pending[key]
+        previous = self._running.get(key)
+        self._running[key] = task
+        try:
+            if previous is not None:
+                await asyncio.wait((previous,))
+            await action()
+        except Exception as e:
+            logger.error(f"Error running debounced action for {key}: {e}")
+        finally:
+            if self._running.get(key) is task:
+                del self._running[key]
@@ -3,64 +3,290 @@ Enhanced Shopping cart management for the Telegram Cafe Bot
 Handles user cart operations and storage
 """
 
-import json
 import logging
-from datetime import datetime
-from enhanced_config import MAX_CART_ITEMS
+import time
+from array import array
+from enhanced_config import MAX_CART_ITEMS, ORDER_TIMEOUT
+from expiry import ExpiringDict
+from menu_catalog import item_keys
+from pricing import price_carts
 
 logger = logging.getLogger(__name__)
 
-class CartManager:
-    """Manages user shopping carts"""
+class Cart:
+    """Compact shopping cart of one user
     
-    def __init__(self):
-        # In-memory cart storage (user_id -> cart_data)
-        # In production, you might want to use Redis or database
-        self.carts = {}
+    Lines are kept as two parallel arrays of interned item keys and
+    quantities; timestamps are epoch seconds. The item count and the
+    subtotal (in cents, for the menu prices it was last priced with) are
+    kept up to date by ``set``, so reading them doesn't walk the lines.
+    
+    Finding a line scans the key array, so ``get`` and ``set`` are
+    O(lines). That is deliberate: the cart managers cap carts at
+    MAX_CART_ITEMS lines, so a scan covers at most that many 4-byte keys
+    in C, while a key -> position dict would cost more memory per cart
+    than the arrays themselves and need fixing up on every removal.
+    """
+    
+    __slots__ = ('keys', 'quantities', 'created_at', 'updated_at', 'count', 'subtotal', 'prices')
+    
+    def __init__(self, now=None):
+        now = time.time() if now is None else now
+        self.keys = array('I')
+        self.quantities = array('I')
+        self.created_at = now
+        self.updated_at = now
+        self.count = 0
+        self.subtotal = 0
+        # Prices of the menu snapshot the subtotal was computed with
+        self.prices = None
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def _position(self, item_id):
+        """Get the line index of an item, or -1"""
+        key = item_keys.find(item_id)
+        if key is None:
+            return -1
+        try:
+            return self.keys.index(key)
+        except ValueError:
+            return -1
+    
+    def get(self, item_id):
+        """Get the quantity of an item, 0 if it is not in the cart"""
+        position = self._position(item_id)
+        return self.quantities[position] if position >= 0 else 0
+    
+    def set(self, item_id, quantity):
+        """Set the quantity of an item; 0 removes the line"""
+        position = self._position(item_id)
+        previous = self.quantities[position] if position >= 0 else 0
+        if quantity <= 0:
+            quantity = 0
+            if position >= 0:
+                del self.keys[position]
+                del self.quantities[position]
+        elif position >= 0:
+            self.quantities[position] = quantity
+        else:
+            self.keys.append(item_keys.key(item_id))
+            self.quantities.append(quantity)
+        
+        change = quantity - previous
+        self.count += change
+        if self.prices is not None:
+            self.subtotal += change * self.prices.get(item_id, 0)
+    
+    def total(self, menu):
+        """Get the price of the cart in integer cents
+        
+        The cart is re-priced only when ``menu`` is a different snapshot
+        (catalog version) than the one it was last priced with.
+        """
+        prices = menu.prices
+        if self.prices is not prices and self.keys:
+            self.subtotal = sum(
+                prices.get(item_keys.item_id(key), 0) * quantity
+                for key, quantity in zip(self.keys, self.quantities)
+            )
+            self.prices = prices
+        return self.subtotal
+    
+    def items(self):
+        """Iterate over (item_id, quantity) lines"""
+        for key, quantity in zip(self.keys, self.quantities):
+            yield item_keys.item_id(key), quantity
+    
+    def to_dict(self):
+        """Get the lines as an {item_id: quantity} dict"""
+        return dict(self.items())
+
+# Shared, read-only answer for users without a cart
+EMPTY_CART = Cart(0.0)
+
+class BaseCartManager:
+    """Interface of cart backends
+    
+    Backends implement get_cart and the mutating methods; the read helpers
+    below are shared. See CartManager (in-process) and RedisCartManager
+    (shared by several bot processes).
+    """
+    
+    # Whether calls wait on I/O; handlers then run them on worker threads
+    # (see async_carts.py)
+    blocking = False
     
     def get_cart(self, user_id):
-        """Get user's cart"""
+        """Get user's cart as a Cart; it must not be modified"""
+        raise NotImplementedError
+    
+    def add_item(self, user_id, item_id, quantity=1):
+        """Add item to user's cart; a negative quantity takes it away
+        
+        Taps on ➕/➖ send their change as a delta, so concurrent taps add
+        up instead of overwriting each other.
+        """
+        raise NotImplementedError
+    
+    def remove_item(self, user_id, item_id):
+        """Remove item from user's cart"""
+        raise NotImplementedError
+    
+    def update_quantity(self, user_id, item_id, quantity):
+        """Update item quantity in cart"""
+        raise NotImplementedError
+    
+    def clear_cart(self, user_id):
+        """Clear user's cart"""
+        raise NotImplementedError
+    
+    def close(self):
+        """Release the resources of the backend"""
+    
+    def get_carts(self, user_ids):
+        """Get the carts of many users, in the same order"""
+        return [self.get_cart(user_id) for user_id in user_ids]
+    
+    def price_carts(self, user_ids, menu):
+        """Price the carts of many users in one call
+        
+        Returns {user_id: PricedCart} with per-line and total amounts in
+        integer cents; see pricing.price_carts.
+        """
+        user_ids = list(user_ids)
+        return dict(zip(user_ids, price_carts(menu, self.get_carts(user_ids))))
+    
+    def get_item_quantity(self, user_id, item_id):
+        """Get quantity of specific item in cart"""
+        try:
+            return self.get_cart(user_id).get(item_id)
+        except Exception as e:
+            logger.error(f"Error getting item quantity for user {user_id}: {e}")
+            return 0
+    
+    def get_cart_total(self, user_id, menu):
+        """Calculate total price of items in cart, in integer cents
+        
+        ``menu`` is a ``MenuSnapshot`` from the menu catalog, whose prices
+        are already parsed into cents.
+        """
+        try:
+            return self.get_cart(user_id).total(menu)
+        
+        except Exception as e:
+            logger.error(f"Error calculating cart total for user {user_id}: {e}")
+            return 0
+    
+    def get_cart_item_count(self, user_id):
+        """Get total number of items in cart"""
         try:
-            return self.carts.get(user_id, {
-                'items': {},
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat()
-            })
+            return self.get_cart(user_id).count
         except Exception as e:
-            logger.error(f"Error getting cart for user {user_id}: {e}")
-            return {'items': {}}
+            logger.error(f"Error getting cart item count for user {user_id}: {e}")
+            return 0
+    
+    def is_cart_empty(self, user_id):
+        """Check if cart is empty"""
+        try:
+            return len(self.get_cart(user_id)) == 0
+        except Exception as e:
+            logger.error(f"Error checking if cart is empty for user {user_id}: {e}")
+            return True
+
+class CartManager(BaseCartManager):
+    """Manages user shopping carts in process memory"""
+    
+    def __init__(self, ttl=ORDER_TIMEOUT, store=None, owns=None):
+        # In-memory cart storage (user_id -> Cart)
+        # Use RedisCartManager to share carts between bot processes
+        # Carts not modified for ``ttl`` seconds are dropped
+        self.carts = ExpiringDict(ttl, name="carts", on_expire=self._on_expire)
+        # Optional durable copy of the carts (see cart_store.py), written behind
+        self.store = store
+        # In sharded mode, tells which users' carts this process holds
+        self.owns = owns
+        if store is not None:
+            self._restore()
+    
+    def _restore(self):
+        """Load the carts of the store, dropping those that already expired"""
+        now = time.time()
+        restored = 0
+        for user_id, lines, created_at, updated_at in self.store.load():
+            if self.owns is not None and not self.owns(user_id):
+                continue
+            remaining = self.carts.ttl - (now - updated_at)
+            if remaining <= 0:
+                self.store.delete(user_id)
+                continue
+            cart = Cart(created_at)
+            cart.updated_at = updated_at
+            for item_id, quantity in lines.items():
+                cart.set(item_id, quantity)
+            self.carts.put(user_id, cart, remaining)
+            restored += 1
+        logger.info(f"Restored {restored} carts")
+    
+    def _changed(self, user_id, cart):
+        """Record a cart mutation: restart its expiry and schedule it for storage"""
+        cart.updated_at = time.time()
+        self.carts.touch(user_id)
+        if self.store is not None:
+            self.store.save(user_id, cart)
+    
+    def _on_expire(self, user_id, cart):
+        if self.store is not None:
+            self.store.delete(user_id)
+    
+    def close(self):
+        """Write pending cart changes to the store"""
+        if self.store is not None:
+            self.store.close()
+    
+    @property
+    def expired_carts(self):
+        """Number of carts dropped for inactivity so far"""
+        return self.carts.evictions
+    
+    def get_cart(self, user_id):
+        """Get user's cart
+        
+        Users without a cart get the shared EMPTY_CART, which must not be
+        modified; use the CartManager methods to change carts.
+        """
+        return self.carts.get(user_id, EMPTY_CART)
+    
+    def _get_or_create_cart(self, user_id):
+        """Get user's cart, creating it on first write"""
+        cart = self.carts.get(user_id)
+        if cart is None:
+            cart = self.carts[user_id] = Cart()
+        return cart
     
     def add_item(self, user_id, item_id, quantity=1):
-        """Add item to user's cart"""
+        """Add item to user's cart; a negative quantity takes it away"""
         try:
-            cart = self.get_cart(user_id)
-            
-            # Initialize cart if needed
-            if 'items' not in cart:
-                cart['items'] = {}
+            cart = self.carts.get(user_id)
+            current = cart.get(item_id) if cart is not None else 0
             
-            # Add or update item quantity
-            if item_id in cart['items']:
-                cart['items'][item_id] += quantity
-            else:
-                cart['items'][item_id] = quantity
+            if not current and quantity <= 0:
+                # Nothing to take away
+                return False
             
             # Check cart limits
-            if len(cart['items']) > MAX_CART_ITEMS:
+            if cart is not None and not current and len(cart) >= MAX_CART_ITEMS:
                 logger.warning(f"Cart limit exceeded for user {user_id}")
                 return False
             
-            # Update timestamps
-            cart['updated_at'] = datetime.now().isoformat()
-            if 'created_at' not in cart:
-                cart['created_at'] = datetime.now().isoformat()
-            
-            # Save cart
-            self.carts[user_id] = cart
+            cart = self._get_or_create_cart(user_id)
+            cart.set(item_id, current + quantity)
+            self._changed(user_id, cart)
             
             logger.info(f"Added item {item_id} (qty: {quantity}) to cart for user {user_id}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error adding item to cart for user {user_id}: {e}")
             return False
@@ -68,18 +294,17 @@ class CartManager:
     def remove_item(self, user_id, item_id):
         """Remove item from user's cart"""
         try:
-            cart = self.get_cart(user_id)
+            cart = self.carts.get(user_id)
             
-            if 'items' in cart and item_id in cart['items']:
-                del cart['items'][item_id]
-                cart['updated_at'] = datetime.now().isoformat()
-                self.carts[user_id] = cart
+            if cart is not None and cart.get(item_id):
+                cart.set(item_id, 0)
+                self._changed(user_id, cart)
                 
                 logger.info(f"Removed item {item_id} from cart for user {user_id}")
                 return True
             
             return False
-            
+        
         except Exception as e:
             logger.error(f"Error removing item from cart for user {user_id}: {e}")
             return False
@@ -90,79 +315,32 @@ class CartManager:
             if quantity <= 0:
                 return self.remove_item(user_id, item_id)
             
-            cart = self.get_cart(user_id)
-            
-            if 'items' in cart:
-                cart['items'][item_id] = quantity
-                cart['updated_at'] = datetime.now().isoformat()
-                self.carts[user_id] = cart
-                
-                logger.info(f"Updated item {item_id} quantity to {quantity} for user {user_id}")
-                return True
+            cart = self.carts.get(user_id)
+            if cart is not None and not cart.get(item_id) and len(cart) >= MAX_CART_ITEMS:
+                logger.warning(f"Cart limit exceeded for user {user_id}")
+                return False
             
-            return False
+            cart = self._get_or_create_cart(user_id)
+            cart.set(item_id, quantity)
+            self._changed(user_id, cart)
             
+            logger.info(f"Updated item {item_id} quantity to {quantity} for user {user_id}")
+            return True
+        
         except Exception as e:
             logger.error(f"Error updating quantity for user {user_id}: {e}")
             return False
     
-    def get_item_quantity(self, user_id, item_id):
-        """Get quantity of specific item in cart"""
-        try:
-            cart = self.get_cart(user_id)
-            return cart.get('items', {}).get(item_id, 0)
-        except Exception as e:
-            logger.error(f"Error getting item quantity for user {user_id}: {e}")
-            return 0
-    
     def clear_cart(self, user_id):
         """Clear user's cart"""
         try:
             if user_id in self.carts:
                 del self.carts[user_id]
+                if self.store is not None:
+                    self.store.delete(user_id)
                 logger.info(f"Cleared cart for user {user_id}")
                 return True
             return False
         except Exception as e:
             logger.error(f"Error clearing cart for user {user_id}: {e}")
             return False
-    
-    def get_cart_total(self, user_id, menu_items):
-        """Calculate total price of items in cart"""
-        try:
-            cart = self.get_cart(user_id)
-            total = 0
-            
-            for item_id, quantity in cart.get('items', {}).items():
-                # Find item in menu
-                for category, items in menu_items.items():
-                    if isinstance(items, dict):
-                        for item in items:
-                            if item.get('id') == item_id:
-                                price = float(item.get('price', '0').replace('$', ''))
-                                total += price * quantity
-                                break
-            
-            return total
-            
-        except Exception as e:
-            logger.error(f"Error calculating cart total for user {user_id}: {e}")
-            return 0
-    
-    def get_cart_item_count(self, user_id):
-        """Get total number of items in cart"""
-        try:
-            cart = self.get_cart(user_id)
-            return sum(cart.get('items', {}).values())
-        except Exception as e:
-            logger.error(f"Error getting cart item count for user {user_id}: {e}")
-            return 0
-    
-    def is_cart_empty(self, user_id):
-        """Check if cart is empty"""
-        try:
-            cart = self.get_cart(user_id)
-            return len(cart.get('items', {})) == 0
-        except Exception as e:
-            logger.error(f"Error checking if cart is empty for user {user_id}: {e}")
-            return True
\ No newline at end of file
@@ -43,7 +43,20 @@ ORDER_EMAIL = "orders@artisancafe.com"
 
 # Cart and Order Settings
 MAX_CART_ITEMS = 50
+CATEGORY_PAGE_SIZE = 8  # items per page of a category keyboard
+SEARCH_RESULTS_LIMIT = 8
+INLINE_RESULTS_LIMIT = 20
+INLINE_CACHE_TIME = 300  # seconds Telegram may cache inline answers
+INLINE_CACHE_SIZE = 1024  # cached inline result sets per menu version
 ORDER_TIMEOUT = 3600  # 1 hour in seconds
+QUANTITY_RENDER_DELAY = 0.4  # seconds of ➕/➖ taps coalesced into one message edit
+CONCURRENT_UPDATES = 256  # updates processed at once, across all users
+# Worker processes carts and conversation state are sharded across by user
+# (see sharding.py); 1 runs everything in this process
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+# Node number in the order IDs of this process (0-255, see order_ids.py);
+# every bot process sharing an orders store needs its own
+ORDER_ID_NODE = int(os.getenv("ORDER_ID_NODE", "0"))
 CURRENCY = '$'
 
 # Order status options
@@ -58,25 +71,37 @@ ORDER_STATUS = {
 
 # Data file paths
 MENU_FILE = 'attached_assets/menu_data.json'
-ORDERS_FILE = 'orders.json'
-
-# Bot Messages
-WELCOME_MESSAGE = f"""
-🎉 {CAFE_NAME} 🎉
-
-{CAFE_TAGLINE}
-
-{CAFE_DESCRIPTION}
-
-Use the buttons below to explore our menu, add items to your cart, and place orders directly through this bot!
-"""
-
+ORDERS_FILE = 'orders.jsonl'  # append-only order log; an old orders.json is migrated
+ORDERS_COMPACT_INTERVAL = 600  # seconds between checks for orders log compaction
+ORDERS_COMPACT_MIN_STALE = 1000  # superseded order records that trigger compaction
+ORDERS_COMMIT_WINDOW = 0.002  # seconds orders wait to share one fsync (group commit)
+# Order backend: "log" (ORDERS_FILE) or "sqlite" (ORDERS_DB_FILE, queryable by
+# customer, status and time)
+ORDER_BACKEND = os.getenv("ORDER_BACKEND", "log")
+ORDERS_DB_FILE = 'orders.db'
+ORDER_WORKERS = 8  # threads per cafe running order storage off the event loop
+ORDER_QUEUE_SIZE = 64  # order calls in flight per cafe before callers wait
+CART_DB_FILE = 'carts.db'  # SQLite database carts are persisted to
+CART_FLUSH_INTERVAL = 1.0  # seconds between batched cart writes
+# Cart backend: "memory" (this process, persisted to CART_DB_FILE) or "redis"
+# (a Redis-protocol server shared by several bot processes)
+CART_BACKEND = os.getenv("CART_BACKEND", "memory")
+CART_REDIS_URL = os.getenv("CART_REDIS_URL", "redis://localhost:6379/0")
+CART_REDIS_POOL_SIZE = 10  # pooled connections per server, and threads running cart calls
+CART_QUEUE_SIZE = 256  # cart calls in flight per cafe before callers wait (redis backend)
+
+# Multi-tenant settings (one process serving several cafes, see tenants.py)
+TENANTS_FILE = os.getenv("TENANTS_FILE", "tenants.json")
+TENANT_CACHE_SIZE = 32  # cafes whose menus stay loaded at once
+
+# Bot Messages (the welcome screen is built per cafe in enhanced_handlers)
 HELP_MESSAGE = """
 🤖 How to use this bot:
 
 /start - Welcome message and main menu
 /menu - Browse our delicious menu
 /cart - View your shopping cart
+/search - Search the menu, e.g. /search latte
 /contact - Get our contact information
 /location - Find us and see our hours
 /help - Show this help message
@@ -4,49 +4,83 @@ Enhanced Message and callback handlers for the Telegram Cafe Bot with Add-to-Car
 
 import logging
 import random
-import json
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton
+from telegram import (
+    Chat, Update, InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardMarkup, KeyboardButton,
+    ForceReply,
+    InlineQueryResultArticle, InputTextMessageContent
+)
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
+from telegram.error import BadRequest
 
 from enhanced_config import (
-    WELCOME_MESSAGE, HELP_MESSAGE, CAFE_PHONE, CAFE_EMAIL, 
-    CAFE_ADDRESS, CAFE_HOURS, CAFE_WEBSITE, CAFE_INSTAGRAM,
-    ORDER_PHONE, ORDER_EMAIL, CAFE_NAME, ADMIN_CHAT_ID, CURRENCY
+    CATEGORY_PAGE_SIZE, SEARCH_RESULTS_LIMIT, INLINE_RESULTS_LIMIT,
+    INLINE_CACHE_TIME, INLINE_CACHE_SIZE, QUANTITY_RENDER_DELAY
 )
-from enhanced_cart_manager import CartManager
-from enhanced_order_manager import OrderManager
+from debounce import Debouncer
+from lru import LRUCache
+from menu_catalog import format_price
+from menu_search import get_search_index, tokenize
+from pricing import price_cart
+from screens import Screen
+from tenants import TenantRegistry, bind_tenant, current_tenant
 
 logger = logging.getLogger(__name__)
 
-# Initialize managers
-cart_manager = CartManager()
-order_manager = OrderManager()
-user_states = {}  # Track user conversation states
+# Re-renders of rapid ➕/➖ taps, coalesced per message
+quantity_renders = Debouncer(QUANTITY_RENDER_DELAY)
+
+def get_tenant():
+    """Get the cafe (tenant) the current update belongs to"""
+    return current_tenant(tenants)
+
+def get_cart_scope(update_or_query):
+    """Get the cart manager (an AsyncCartManager) and cart owner for an update or callback query
+    
+    Members of a group chat share the chat's cart (see group_cart.py) and
+    are identified as (chat_id, user_id); elsewhere each user has their own.
+    """
+    tenant = get_tenant()
+    if isinstance(update_or_query, Update):
+        chat = update_or_query.effective_chat
+        user = update_or_query.effective_user
+    else:
+        chat = update_or_query.message.chat if update_or_query.message else None
+        user = update_or_query.from_user
+    
+    if chat is not None and chat.type in (Chat.GROUP, Chat.SUPERGROUP):
+        return tenant.table_carts, (chat.id, user.id)
+    return tenant.carts, user.id
+
+def render_key(query):
+    """Get the key of the message of a callback query in quantity_renders
+    
+    In a group every member's taps on the shared message coalesce.
+    """
+    message_key = query.inline_message_id or (query.message.chat_id, query.message.message_id)
+    return get_tenant().key, message_key
+
+async def bind_update_tenant(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Resolve the tenant of an update from the bot that received it"""
+    bind_tenant(tenants.for_token(context.bot.token))
 
 def load_menu_data():
-    """Load menu data from JSON file"""
-    try:
-        with open('attached_assets/menu_data.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading menu data: {e}")
-        return {}
+    """Get the current menu data of the current tenant"""
+    return get_tenant().menu().data
 
 def get_item_by_id(item_id):
     """Get menu item by ID"""
     try:
-        menu_data = load_menu_data()
-        for category, items in menu_data.items():
-            if isinstance(items, list):
-                for item in items:
-                    if item.get('id') == item_id:
-                        return item
+        return get_tenant().menu().get_item(item_id)
     except Exception as e:
         logger.error(f"Error getting item {item_id}: {e}")
     return None
 
 def create_main_menu_keyboard():
+    """Get the prebuilt main menu keyboard"""
+    return get_tenant().screens["main_menu"].reply_markup
+
+def _build_main_menu_keyboard():
     """Create main menu keyboard with cart indicator"""
     keyboard = [
         [InlineKeyboardButton("☕ Beverages", callback_data="category_beverages")],
@@ -58,28 +92,47 @@ def create_main_menu_keyboard():
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def create_category_keyboard(category):
-    """Create keyboard for menu category with items"""
+def create_category_keyboard(category, page=0):
+    """Create keyboard for one page of a menu category"""
     try:
-        menu_data = load_menu_data()
-        items = menu_data.get(category, [])
-        
-        keyboard = []
-        for item in items:
-            if isinstance(item, dict):
-                keyboard.append([InlineKeyboardButton(
-                    f"{item.get('name', 'Item')} - {item.get('price', '$0.00')}", 
-                    callback_data=f"item_{item.get('id', '')}"
-                )])
-        
-        keyboard.append([InlineKeyboardButton("🛒 View Cart", callback_data="show_cart")])
-        keyboard.append([InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")])
-        
-        return InlineKeyboardMarkup(keyboard)
+        menu = get_tenant().menu()
+        if category not in menu.categories:
+            # Don't let unknown callback data grow the cache
+            return _build_category_keyboard(menu, category, page)
+        _, page, _ = menu.category_page(category, page, CATEGORY_PAGE_SIZE)
+        return menu.cached(
+            ("enhanced.category", category, page),
+            lambda: _build_category_keyboard(menu, category, page)
+        )
     except Exception as e:
         logger.error(f"Error creating category keyboard: {e}")
         return InlineKeyboardMarkup([[InlineKeyboardButton("◀️ Back", callback_data="main_menu")]])
 
+def _build_category_keyboard(menu, category, page):
+    """Build the keyboard of one category page for one menu version"""
+    keyboard = []
+    items, page, page_count = menu.category_page(category, page, CATEGORY_PAGE_SIZE)
+    for item in items:
+        if isinstance(item, dict):
+            keyboard.append([InlineKeyboardButton(
+                f"{item.get('name', 'Item')} - {item.get('price', '$0.00')}", 
+                callback_data=f"item_{item.get('id', '')}"
+            )])
+    
+    if page_count > 1:
+        nav_row = []
+        if page > 0:
+            nav_row.append(InlineKeyboardButton("◀️ Prev", callback_data=f"catpage_{page - 1}_{category}"))
+        nav_row.append(InlineKeyboardButton(f"{page + 1}/{page_count}", callback_data="noop"))
+        if page < page_count - 1:
+            nav_row.append(InlineKeyboardButton("Next ▶️", callback_data=f"catpage_{page + 1}_{category}"))
+        keyboard.append(nav_row)
+    
+    keyboard.append([InlineKeyboardButton("🛒 View Cart", callback_data="show_cart")])
+    keyboard.append([InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")])
+    
+    return InlineKeyboardMarkup(keyboard)
+
 def create_item_keyboard(item_id):
     """Create keyboard for individual menu item"""
     keyboard = [
@@ -89,39 +142,95 @@ def create_item_keyboard(item_id):
     ]
     return InlineKeyboardMarkup(keyboard)
 
+def _build_screens(cfg) -> dict:
+    """Build the static screens from the config module"""
+    md = ParseMode.MARKDOWN
+    main_menu_keyboard = _build_main_menu_keyboard()
+    back_keyboard = InlineKeyboardMarkup(
+        [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
+    )
+    return {
+        "welcome": Screen(f"""
+🎉 {cfg.CAFE_NAME} 🎉
+
+{cfg.CAFE_TAGLINE}
+
+{cfg.CAFE_DESCRIPTION}
+
+Use the buttons below to explore our menu, add items to your cart, and place orders directly through this bot!
+""", md, main_menu_keyboard),
+        "menu": Screen("""
+🍽️ **Our Menu** 🍽️
+
+Explore our delicious offerings by category:
+• Fresh coffee and specialty drinks
+• Hearty meals and light bites  
+• Sweet desserts and pastries
+
+Choose a category to see our full selection and add items to your cart!
+""", md, main_menu_keyboard),
+        "main_menu": Screen("""
+🍽️ **Welcome to Our Menu!** 🍽️
+
+Choose a category below to explore our delicious offerings:
+
+✨ Fresh ingredients, made with love
+💫 Perfect for dine-in, takeout, or delivery
+🛒 Add items to your cart and order directly!
+""", md, main_menu_keyboard),
+        "help": Screen(cfg.HELP_MESSAGE, md, back_keyboard),
+        "contact": Screen(f"""
+📞 **Contact {cfg.CAFE_NAME}** 📞
+
+**Phone:** {cfg.CAFE_PHONE}
+**Email:** {cfg.CAFE_EMAIL}
+**Website:** {cfg.CAFE_WEBSITE}
+**Instagram:** {cfg.CAFE_INSTAGRAM}
+
+**Address:**
+{cfg.CAFE_ADDRESS}
+
+We'd love to hear from you! 💌
+""", md, back_keyboard),
+        "location": Screen(f"""
+📍 **Find {cfg.CAFE_NAME}** 📍
+
+**Address:**
+{cfg.CAFE_ADDRESS}
+
+{cfg.CAFE_HOURS}
+
+See you soon! ✨
+""", md, back_keyboard),
+    }
+
+# Cafes served by this process; menus and screens are loaded per tenant on demand
+tenants = TenantRegistry(_build_screens)
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command with welcome message"""
     try:
+        screen = get_tenant().screens["welcome"]
         await update.message.reply_text(
-            WELCOME_MESSAGE,
-            reply_markup=create_main_menu_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in start_command: {e}")
         await update.message.reply_text(
-            f"Welcome to {CAFE_NAME}! 🎉",
+            f"Welcome to {get_tenant().config.CAFE_NAME}! 🎉",
             reply_markup=create_main_menu_keyboard()
         )
 
 async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /menu command"""
     try:
-        message = """
-🍽️ **Our Menu** 🍽️
-
-Explore our delicious offerings by category:
-• Fresh coffee and specialty drinks
-• Hearty meals and light bites  
-• Sweet desserts and pastries
-
-Choose a category to see our full selection and add items to your cart!
-"""
-        
+        screen = get_tenant().screens["menu"]
         await update.message.reply_text(
-            message,
-            reply_markup=create_main_menu_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in menu_command: {e}")
@@ -133,8 +242,7 @@ Choose a category to see our full selection and add items to your cart!
 async def cart_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /cart command"""
     try:
-        user_id = update.effective_user.id
-        await show_cart_internal(update, context, user_id, is_message=True)
+        await show_cart_internal(update, context, is_message=True)
     except Exception as e:
         logger.error(f"Error in cart_command: {e}")
         await update.message.reply_text(
@@ -142,14 +250,100 @@ async def cart_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
             reply_markup=create_main_menu_keyboard()
         )
 
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /search command"""
+    try:
+        query_text = " ".join(context.args or [])
+        if not query_text:
+            await update.message.reply_text(
+                "🔍 Tell me what you're looking for, e.g. /search latte",
+                reply_markup=create_main_menu_keyboard()
+            )
+            return
+        
+        menu = get_tenant().menu()
+        results = get_search_index(menu).search(query_text, limit=SEARCH_RESULTS_LIMIT)
+        
+        if not results:
+            await update.message.reply_text(
+                f"🔍 No menu items match \"{query_text}\".",
+                reply_markup=create_main_menu_keyboard()
+            )
+            return
+        
+        keyboard = [
+            [InlineKeyboardButton(
+                f"{item.get('name', 'Item')} - {format_price(menu.get_price(item['id']))}",
+                callback_data=f"item_{item['id']}"
+            )]
+            for item in results
+        ]
+        keyboard.append([InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")])
+        
+        await update.message.reply_text(
+            f"🔍 Results for \"{query_text}\":",
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+    except Exception as e:
+        logger.error(f"Error in search_command: {e}")
+        await update.message.reply_text("Sorry, search is not available right now.")
+
+def _build_inline_result(menu, item):
+    """Build the inline query result of one menu item"""
+    price = format_price(menu.get_price(item['id']))
+    text = f"**{item.get('name', 'Menu Item')}**\n\n"
+    text += f"💰 **Price:** {price}\n"
+    text += f"📝 {item.get('description', '')}"
+    return InlineQueryResultArticle(
+        id=item['id'],
+        title=item.get('name', 'Menu Item'),
+        description=f"{price} · {item.get('description', '')}",
+        input_message_content=InputTextMessageContent(text, parse_mode=ParseMode.MARKDOWN),
+        reply_markup=InlineKeyboardMarkup(
+            [[InlineKeyboardButton("🛒 Add to Cart", callback_data=f"add_item_{item['id']}")]]
+        )
+    )
+
+def get_inline_results(query_text):
+    """Get the inline results of a query from the per-menu-version cache"""
+    menu = get_tenant().menu()
+    key = " ".join(tokenize(query_text))
+    results_cache = menu.cached("inline_results", lambda: LRUCache(INLINE_CACHE_SIZE))
+    
+    def build():
+        if key:
+            items = get_search_index(menu).search(key, limit=INLINE_RESULTS_LIMIT)
+        else:
+            items = list(menu.items_by_id.values())[:INLINE_RESULTS_LIMIT]
+        # Built once per menu version; each article is reused across queries
+        return tuple(
+            menu.cached(("inline_result", item['id']), lambda item=item: _build_inline_result(menu, item))
+            for item in items
+        )
+    
+    return results_cache.get_or_create(key, build)
+
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Answer inline queries (@bot latte) with matching menu items"""
+    try:
+        inline_query = update.inline_query
+        # Results depend only on the query text, so Telegram may share them between users
+        await inline_query.answer(
+            get_inline_results(inline_query.query),
+            cache_time=INLINE_CACHE_TIME,
+            is_personal=False
+        )
+    except Exception as e:
+        logger.error(f"Error in handle_inline_query: {e}")
+
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /help command"""
     try:
-        keyboard = [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
+        screen = get_tenant().screens["help"]
         await update.message.reply_text(
-            HELP_MESSAGE,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in help_command: {e}")
@@ -158,53 +352,28 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def contact_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /contact command"""
     try:
-        contact_message = f"""
-📞 **Contact {CAFE_NAME}** 📞
-
-**Phone:** {CAFE_PHONE}
-**Email:** {CAFE_EMAIL}
-**Website:** {CAFE_WEBSITE}
-**Instagram:** {CAFE_INSTAGRAM}
-
-**Address:**
-{CAFE_ADDRESS}
-
-We'd love to hear from you! 💌
-"""
-        keyboard = [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
-        
+        screen = get_tenant().screens["contact"]
         await update.message.reply_text(
-            contact_message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in contact_command: {e}")
-        await update.message.reply_text(f"📞 Contact us at {CAFE_PHONE}")
+        await update.message.reply_text(f"📞 Contact us at {get_tenant().config.CAFE_PHONE}")
 
 async def location_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /location command"""
     try:
-        location_message = f"""
-📍 **Find {CAFE_NAME}** 📍
-
-**Address:**
-{CAFE_ADDRESS}
-
-{CAFE_HOURS}
-
-See you soon! ✨
-"""
-        keyboard = [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
-        
+        screen = get_tenant().screens["location"]
         await update.message.reply_text(
-            location_message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in location_command: {e}")
-        await update.message.reply_text(f"📍 Visit us at {CAFE_ADDRESS}")
+        await update.message.reply_text(f"📍 Visit us at {get_tenant().config.CAFE_ADDRESS}")
 
 async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle all callback queries from inline keyboards"""
@@ -215,11 +384,18 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         callback_data = query.data
         user_id = update.effective_user.id
         
+        if not callback_data.startswith(("increase_", "decrease_")):
+            # This edit of the message supersedes a pending quantity render
+            await quantity_renders.cancel(render_key(query))
+        
         if callback_data == "main_menu":
             await handle_main_menu(query)
         elif callback_data.startswith("category_"):
             category = callback_data.replace("category_", "")
             await handle_category_selection(query, category)
+        elif callback_data.startswith("catpage_"):
+            _, page, category = callback_data.split("_", 2)
+            await handle_category_selection(query, category, int(page))
         elif callback_data.startswith("item_"):
             item_id = callback_data.replace("item_", "")
             await handle_item_selection(query, item_id)
@@ -255,32 +431,23 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
 async def handle_main_menu(query) -> None:
     """Handle main menu callback"""
     try:
-        main_menu_text = """
-🍽️ **Welcome to Our Menu!** 🍽️
-
-Choose a category below to explore our delicious offerings:
-
-✨ Fresh ingredients, made with love
-💫 Perfect for dine-in, takeout, or delivery
-🛒 Add items to your cart and order directly!
-"""
-        
+        screen = get_tenant().screens["main_menu"]
         await query.edit_message_text(
-            main_menu_text,
-            reply_markup=create_main_menu_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
     except Exception as e:
         logger.error(f"Error in handle_main_menu: {e}")
 
-async def handle_category_selection(query, category: str) -> None:
-    """Handle category selection"""
+async def handle_category_selection(query, category: str, page: int = 0) -> None:
+    """Handle category selection and category page changes"""
     try:
         category_message = f"🍽️ **{category.title()} Menu**\n\nChoose an item to view details:"
         
         await query.edit_message_text(
             category_message,
-            reply_markup=create_category_keyboard(category),
+            reply_markup=create_category_keyboard(category, page),
             parse_mode=ParseMode.MARKDOWN
         )
     except Exception as e:
@@ -318,14 +485,14 @@ Ready to add this to your cart?
 async def handle_add_to_cart(query, context, item_id: str) -> None:
     """Handle adding item to cart"""
     try:
-        user_id = query.from_user.id
         item = get_item_by_id(item_id)
         
         if not item:
             await query.answer("Item not found!")
             return
         
-        success = cart_manager.add_item(user_id, item_id, 1)
+        cart_manager, owner = get_cart_scope(query)
+        success = await cart_manager.add_item(owner, item_id, 1)
         
         if success:
             await query.answer(f"✅ {item['name']} added to cart!")
@@ -359,69 +526,92 @@ async def handle_add_to_cart(query, context, item_id: str) -> None:
         await query.answer("Error adding item to cart")
 
 async def handle_quantity_change(query, context, item_id: str, action: str) -> None:
-    """Handle quantity increase/decrease"""
+    """Handle quantity increase/decrease
+    
+    The cart changes at once, but the message is only re-rendered when
+    taps on it pause for QUANTITY_RENDER_DELAY, showing the final quantity.
+    The callback query itself is answered by handle_callback_query.
+    """
     try:
-        user_id = query.from_user.id
-        current_qty = cart_manager.get_item_quantity(user_id, item_id)
-        
+        cart_manager, owner = get_cart_scope(query)
         if action == "increase":
-            new_qty = current_qty + 1
+            delta = 1
         elif action == "decrease":
-            new_qty = max(0, current_qty - 1)
+            delta = -1
         else:
             return
         
-        if new_qty == 0:
-            cart_manager.remove_item(user_id, item_id)
-            await query.answer("Item removed from cart!")
-            await handle_show_cart(query, context)
-        else:
-            cart_manager.update_quantity(user_id, item_id, new_qty)
-            await query.answer(f"Quantity updated to {new_qty}")
-            
-            item = get_item_by_id(item_id)
-            keyboard = [
-                [
-                    InlineKeyboardButton("➖", callback_data=f"decrease_{item_id}"),
-                    InlineKeyboardButton(str(new_qty), callback_data=f"quantity_{item_id}"),
-                    InlineKeyboardButton("➕", callback_data=f"increase_{item_id}")
-                ],
-                [InlineKeyboardButton("🛒 View Cart", callback_data="show_cart")],
-                [InlineKeyboardButton("◀️ Continue Shopping", callback_data="main_menu")]
-            ]
-            
-            price = float(item.get('price', '$0.00').replace('$', ''))
-            item_total = price * new_qty
-            
-            text = f"**{item['name']}** - Quantity: {new_qty}\n\n"
-            text += f"💰 Price: {item['price']} each\n"
-            text += f"💰 Total: ${item_total:.2f}\n\n"
-            text += "Adjust quantity or continue shopping:"
-            
-            await query.edit_message_text(
-                text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode=ParseMode.MARKDOWN
-            )
+        # One atomic increment (HINCRBY on Redis): taps of several
+        # processes or group members add up instead of overwriting
+        await cart_manager.add_item(owner, item_id, delta)
+        
+        quantity_renders.schedule(
+            render_key(query),
+            lambda: render_item_quantity(query, context, item_id)
+        )
             
     except Exception as e:
         logger.error(f"Error updating quantity: {e}")
         await query.answer("Error updating quantity")
 
+async def render_item_quantity(query, context, item_id: str) -> None:
+    """Show the current cart quantity of an item on the message of a query"""
+    try:
+        tenant = get_tenant()
+        cart_manager, owner = get_cart_scope(query)
+        quantity = await cart_manager.get_item_quantity(owner, item_id)
+        
+        if quantity == 0:
+            await handle_show_cart(query, context)
+            return
+        
+        menu = tenant.menu()
+        item = menu.get_item(item_id)
+        keyboard = [
+            [
+                InlineKeyboardButton("➖", callback_data=f"decrease_{item_id}"),
+                InlineKeyboardButton(str(quantity), callback_data=f"quantity_{item_id}"),
+                InlineKeyboardButton("➕", callback_data=f"increase_{item_id}")
+            ],
+            [InlineKeyboardButton("🛒 View Cart", callback_data="show_cart")],
+            [InlineKeyboardButton("◀️ Continue Shopping", callback_data="main_menu")]
+        ]
+        
+        price = menu.get_price(item_id)
+        item_total = price * quantity
+        
+        text = f"**{item['name']}** - Quantity: {quantity}\n\n"
+        text += f"💰 Price: {format_price(price)} each\n"
+        text += f"💰 Total: {format_price(item_total)}\n\n"
+        text += "Adjust quantity or continue shopping:"
+        
+        await query.edit_message_text(
+            text,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    except BadRequest as e:
+        # Taps that cancel out leave the message as it was
+        if "not modified" not in str(e):
+            logger.error(f"Error rendering quantity: {e}")
+    except Exception as e:
+        logger.error(f"Error rendering quantity: {e}")
+
 async def handle_show_cart(query, context) -> None:
     """Handle show cart callback"""
     try:
-        user_id = query.from_user.id
-        await show_cart_internal(query, context, user_id, is_message=False)
+        await show_cart_internal(query, context, is_message=False)
     except Exception as e:
         logger.error(f"Error showing cart: {e}")
 
-async def show_cart_internal(update_or_query, context, user_id, is_message=False) -> None:
+async def show_cart_internal(update_or_query, context, is_message=False) -> None:
     """Internal function to show cart contents"""
     try:
-        cart = cart_manager.get_cart(user_id)
+        cart_manager, owner = get_cart_scope(update_or_query)
+        cart = await cart_manager.get_cart(owner)
         
-        if not cart or not cart.get('items'):
+        if not cart:
             text = "🛒 Your cart is empty!\n\nBrowse our menu to add some delicious items."
             keyboard = [[InlineKeyboardButton("🍴 View Menu", callback_data="main_menu")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -432,19 +622,19 @@ async def show_cart_internal(update_or_query, context, user_id, is_message=False
                 await update_or_query.edit_message_text(text, reply_markup=reply_markup)
             return
         
-        text = "🛒 **Your Cart**\n\n"
-        total = 0
+        text = "🛒 **Table Cart**\n\n" if isinstance(owner, tuple) else "🛒 **Your Cart**\n\n"
         keyboard = []
+        menu = get_tenant().menu()
+        total = cart.total(menu)
         
-        for item_id, quantity in cart['items'].items():
-            item = get_item_by_id(item_id)
+        for item_id, quantity in cart.items():
+            item = menu.get_item(item_id)
             if item:
-                price = float(item.get('price', '$0.00').replace('$', ''))
+                price = menu.get_price(item_id)
                 item_total = price * quantity
-                total += item_total
                 
                 text += f"**{item['name']}**\n"
-                text += f"💰 {item['price']} × {quantity} = ${item_total:.2f}\n\n"
+                text += f"💰 {format_price(price)} × {quantity} = {format_price(item_total)}\n\n"
                 
                 keyboard.append([
                     InlineKeyboardButton("➖", callback_data=f"decrease_{item_id}"),
@@ -452,7 +642,7 @@ async def show_cart_internal(update_or_query, context, user_id, is_message=False
                     InlineKeyboardButton("➕", callback_data=f"increase_{item_id}")
                 ])
         
-        text += f"💰 **Total: ${total:.2f}**\n\n"
+        text += f"💰 **Total: {format_price(total)}**\n\n"
         
         if total > 0:
             keyboard.append([InlineKeyboardButton("📋 Place Order", callback_data="place_order")])
@@ -482,30 +672,44 @@ async def handle_place_order(query, context) -> None:
     """Handle place order process"""
     try:
         user_id = query.from_user.id
-        cart = cart_manager.get_cart(user_id)
+        cart_manager, owner = get_cart_scope(query)
+        cart = await cart_manager.get_cart(owner)
         
-        if not cart or not cart.get('items'):
+        if not cart:
             await query.answer("Your cart is empty!")
             return
         
-        # Set user state to collecting contact info
-        user_states[user_id] = 'awaiting_contact'
-        
         text = "📞 **Contact Information Required**\n\n"
         text += "To place your order, we need your contact information.\n\n"
-        text += "Please share your phone number using the button below, or type your contact details:"
         
-        # Create contact request keyboard
-        contact_keyboard = ReplyKeyboardMarkup([
-            [KeyboardButton("📞 Share Phone Number", request_contact=True)]
-        ], resize_keyboard=True, one_time_keyboard=True)
+        if isinstance(owner, tuple):
+            # Telegram only allows contact buttons in private chats; in a
+            # group the member who checks out replies with their details
+            text += "Please reply to the message below with your contact details:"
+            await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN)
+            await context.bot.send_message(
+                chat_id=query.message.chat_id,
+                text=f"👆 {query.from_user.mention_html()}, type your phone number or contact info:",
+                parse_mode=ParseMode.HTML,
+                reply_markup=ForceReply(selective=True)
+            )
+        else:
+            text += "Please share your phone number using the button below, or type your contact details:"
+            
+            # Create contact request keyboard
+            contact_keyboard = ReplyKeyboardMarkup([
+                [KeyboardButton("📞 Share Phone Number", request_contact=True)]
+            ], resize_keyboard=True, one_time_keyboard=True)
+            
+            await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN)
+            await context.bot.send_message(
+                chat_id=query.message.chat_id,
+                text="👆 Use the button below or type your contact info:",
+                reply_markup=contact_keyboard
+            )
         
-        await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN)
-        await context.bot.send_message(
-            chat_id=query.message.chat_id,
-            text="👆 Use the button below or type your contact info:",
-            reply_markup=contact_keyboard
-        )
+        # Collect contact info only once the prompt was sent
+        get_tenant().user_states[user_id] = 'awaiting_contact'
         
     except Exception as e:
         logger.error(f"Error placing order: {e}")
@@ -514,8 +718,8 @@ async def handle_place_order(query, context) -> None:
 async def handle_clear_cart(query, context) -> None:
     """Handle clear cart"""
     try:
-        user_id = query.from_user.id
-        cart_manager.clear_cart(user_id)
+        cart_manager, owner = get_cart_scope(query)
+        await cart_manager.clear_cart(owner)
         await query.answer("Cart cleared!")
         await handle_main_menu(query)
     except Exception as e:
@@ -525,53 +729,24 @@ async def handle_clear_cart(query, context) -> None:
 async def handle_contact_info(query) -> None:
     """Handle contact information display"""
     try:
-        contact_message = f"""
-📞 **Contact {CAFE_NAME}** 📞
-
-**Phone:** {CAFE_PHONE}
-**Email:** {CAFE_EMAIL}
-**Website:** {CAFE_WEBSITE}
-**Instagram:** {CAFE_INSTAGRAM}
-
-**Address:**
-{CAFE_ADDRESS}
-
-We'd love to hear from you! 💌
-"""
-        
-        keyboard = [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
-        
+        screen = get_tenant().screens["contact"]
         await query.edit_message_text(
-            contact_message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
-        
     except Exception as e:
         logger.error(f"Error in handle_contact_info: {e}")
 
 async def handle_location_info(query) -> None:
     """Handle location information"""
     try:
-        location_message = f"""
-📍 **Find {CAFE_NAME}** 📍
-
-**Address:**
-{CAFE_ADDRESS}
-
-{CAFE_HOURS}
-
-See you soon! ✨
-"""
-        
-        keyboard = [[InlineKeyboardButton("◀️ Back to Menu", callback_data="main_menu")]]
-        
+        screen = get_tenant().screens["location"]
         await query.edit_message_text(
-            location_message,
-            reply_markup=InlineKeyboardMarkup(keyboard),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
-        
     except Exception as e:
         logger.error(f"Error in handle_location_info: {e}")
 
@@ -580,7 +755,7 @@ async def handle_contact(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     try:
         user_id = update.effective_user.id
         
-        if user_states.get(user_id) != 'awaiting_contact':
+        if get_tenant().user_states.get(user_id) != 'awaiting_contact':
             return
         
         contact = update.message.contact
@@ -597,7 +772,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     try:
         user_id = update.effective_user.id
         
-        if user_states.get(user_id) == 'awaiting_contact':
+        if get_tenant().user_states.get(user_id) == 'awaiting_contact':
             contact_info = update.message.text
             await finalize_order(update, context, contact_info=contact_info)
         else:
@@ -612,20 +787,17 @@ async def finalize_order(update: Update, context: ContextTypes.DEFAULT_TYPE, pho
     """Finalize and submit the order"""
     try:
         user_id = update.effective_user.id
+        tenant = get_tenant()
         user = update.effective_user
-        cart = cart_manager.get_cart(user_id)
+        cart_manager, owner = get_cart_scope(update)
+        cart = await cart_manager.get_cart(owner)
         
-        if not cart or not cart.get('items'):
+        if not cart:
             await update.message.reply_text("Your cart is empty!")
             return
         
-        # Calculate total
-        total = 0
-        for item_id, quantity in cart['items'].items():
-            item = get_item_by_id(item_id)
-            if item:
-                price = float(item.get('price', '$0.00').replace('$', ''))
-                total += price * quantity
+        # Calculate total in cents
+        total = cart.total(tenant.menu())
         
         # Create order data
         order_data = {
@@ -635,19 +807,20 @@ async def finalize_order(update: Update, context: ContextTypes.DEFAULT_TYPE, pho
             'last_name': user.last_name,
             'phone_number': phone_number,
             'contact_info': contact_info,
-            'items': cart['items'].copy(),
-            'total_amount': total
+            'items': cart.to_dict(),
+            'total_cents': total,
+            'total_amount': total / 100
         }
         
         # Create the order
-        order_id = order_manager.create_order(order_data)
+        order_id = await tenant.orders.create_order(order_data)
         
         if order_id:
             # Clear user's cart
-            cart_manager.clear_cart(user_id)
+            await cart_manager.clear_cart(owner)
             
             # Reset user state
-            user_states.pop(user_id, None)
+            tenant.user_states.pop(user_id, None)
             
             # Send confirmation to customer
             confirmation_text = f"✅ **Order Placed Successfully!**\n\n"
@@ -678,7 +851,7 @@ async def finalize_order(update: Update, context: ContextTypes.DEFAULT_TYPE, pho
 async def send_order_to_admin(context: ContextTypes.DEFAULT_TYPE, order_id: str) -> None:
     """Send order notification to admin chat"""
     try:
-        order = order_manager.get_order(order_id)
+        order = await get_tenant().orders.get_order(order_id)
         if not order:
             logger.error(f"Order {order_id} not found")
             return
@@ -691,22 +864,20 @@ async def send_order_to_admin(context: ContextTypes.DEFAULT_TYPE, order_id: str)
         admin_message += f"📅 Time: {order['created_at'][:19].replace('T', ' ')}\n\n"
         
         admin_message += "**ITEMS ORDERED:**\n"
-        total = 0
+        priced = price_cart(get_tenant().menu(), order['items'])
         
-        for item_id, quantity in order['items'].items():
-            item = get_item_by_id(item_id)
-            if item:
-                price = float(item.get('price', '$0.00').replace('$', ''))
-                item_total = price * quantity
-                total += item_total
-                admin_message += f"• {item['name']} × {quantity} = ${item_total:.2f}\n"
+        for line in priced.lines:
+            if line.item:
+                admin_message += f"• {line.item['name']} × {line.quantity} = {format_price(line.amount)}\n"
         
-        admin_message += f"\n💰 **TOTAL: ${total:.2f}**\n"
+        # The total the customer confirmed, if the order recorded it
+        total = order.get('total_cents', priced.total)
+        admin_message += f"\n💰 **TOTAL: {format_price(total)}**\n"
         admin_message += f"📊 Status: {order['status']}"
         
         # Send to admin chat
         await context.bot.send_message(
-            chat_id=ADMIN_CHAT_ID,
+            chat_id=get_tenant().config.ADMIN_CHAT_ID,
             text=admin_message,
             parse_mode=ParseMode.MARKDOWN
         )
@@ -7,20 +7,30 @@ Main application entry point
 import asyncio
 import logging
 import os
-from telegram.ext import ApplicationBuilder, CommandHandler, CallbackQueryHandler, MessageHandler, filters
+from telegram import Update
+from telegram.ext import (
+    ApplicationBuilder, CommandHandler, CallbackQueryHandler, InlineQueryHandler,
+    MessageHandler, TypeHandler, filters
+)
 
 from enhanced_handlers import (
     start_command,
     menu_command,
     cart_command,
+    search_command,
     help_command,
     contact_command,
     location_command,
     handle_callback_query,
+    handle_inline_query,
     handle_contact,
-    handle_message
+    handle_message,
+    bind_update_tenant,
+    tenants
 )
-from enhanced_config import BOT_TOKEN
+from enhanced_config import CONCURRENT_UPDATES, SHARD_COUNT
+from sharding import ShardRouter
+from update_processor import PerUserUpdateProcessor
 
 # Configure logging
 logging.basicConfig(
@@ -29,35 +39,134 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+ALLOWED_UPDATES = ["message", "callback_query", "inline_query"]
+
+def build_application(token):
+    """Create the bot application for one cafe"""
+    # Serve users concurrently; each user's updates still run in order
+    application = (
+        ApplicationBuilder()
+        .token(token)
+        .concurrent_updates(PerUserUpdateProcessor(CONCURRENT_UPDATES))
+        .build()
+    )
+    
+    # Resolve the cafe of every update before any other handler runs
+    application.add_handler(TypeHandler(Update, bind_update_tenant), group=-1)
+    
+    # Add command handlers
+    application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(CommandHandler("menu", menu_command))
+    application.add_handler(CommandHandler("cart", cart_command))
+    application.add_handler(CommandHandler("search", search_command))
+    application.add_handler(CommandHandler("help", help_command))
+    application.add_handler(CommandHandler("contact", contact_command))
+    application.add_handler(CommandHandler("location", location_command))
+    
+    # Add callback query handler for inline keyboards
+    application.add_handler(CallbackQueryHandler(handle_callback_query))
+    
+    # Inline mode (@bot latte); enable it for the bot with /setinline in BotFather
+    application.add_handler(InlineQueryHandler(handle_inline_query))
+    
+    # Message handlers for contact and text
+    application.add_handler(MessageHandler(filters.CONTACT, handle_contact))
+    application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    
+    return application
+
+def build_router_application(token, router):
+    """Create the application that only forwards a cafe's updates to the shard workers"""
+    application = ApplicationBuilder().token(token).build()
+    
+    async def forward_update(update, context):
+        router.route(token, update)
+    
+    application.add_handler(TypeHandler(Update, forward_update))
+    return application
+
+async def serve_shard(queue):
+    """Run the handlers on the updates routed to this shard worker"""
+    applications = {tenant.token: build_application(tenant.token) for tenant in tenants.tenants()}
+    for application in applications.values():
+        await application.initialize()
+        await application.start()
+    
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            message = await loop.run_in_executor(None, queue.get)
+            if message is None:
+                break
+            token, data = message
+            application = applications[token]
+            await application.update_queue.put(Update.de_json(data, application.bot))
+    finally:
+        for application in applications.values():
+            await application.stop()
+            await application.shutdown()
+
+def run_shard_worker(queue):
+    """Entry point of a shard worker process (see sharding.py)"""
+    try:
+        asyncio.run(serve_shard(queue))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for tenant in tenants.tenants():
+            tenant.close()
+
+async def run_applications(applications):
+    """Poll several bots in one event loop until interrupted"""
+    for application in applications:
+        await application.initialize()
+        await application.updater.start_polling(allowed_updates=ALLOWED_UPDATES)
+        await application.start()
+    
+    try:
+        # Sleep until the process is interrupted
+        await asyncio.Event().wait()
+    finally:
+        for application in applications:
+            await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
+
+def poll(applications):
+    """Poll Telegram for the applications until interrupted"""
+    if len(applications) == 1:
+        # Start the bot with polling
+        applications[0].run_polling(allowed_updates=ALLOWED_UPDATES)
+    else:
+        try:
+            asyncio.run(run_applications(applications))
+        except KeyboardInterrupt:
+            logger.info("Stopped")
+
 def main():
     """Main function to run the enhanced bot"""
     try:
-        # Create application
-        application = ApplicationBuilder().token(BOT_TOKEN).build()
+        cafes = tenants.tenants()
         
-        # Add command handlers
-        application.add_handler(CommandHandler("start", start_command))
-        application.add_handler(CommandHandler("menu", menu_command))
-        application.add_handler(CommandHandler("cart", cart_command))
-        application.add_handler(CommandHandler("help", help_command))
-        application.add_handler(CommandHandler("contact", contact_command))
-        application.add_handler(CommandHandler("location", location_command))
+        logger.info(f"Starting Enhanced Cafe Bot with Add-to-Cart System for {len(cafes)} cafe(s)...")
         
-        # Add callback query handler for inline keyboards
-        application.add_handler(CallbackQueryHandler(handle_callback_query))
-        
-        # Message handlers for contact and text
-        application.add_handler(MessageHandler(filters.CONTACT, handle_contact))
-        application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
-        
-        logger.info("Starting Enhanced Cafe Bot with Add-to-Cart System...")
-        
-        # Start the bot with polling
-        application.run_polling(allowed_updates=["message", "callback_query"])
+        if SHARD_COUNT > 1:
+            # Poll here, handle updates in the shard worker processes
+            router = ShardRouter(run_shard_worker)
+            router.start()
+            try:
+                poll([build_router_application(tenant.token, router) for tenant in cafes])
+            finally:
+                router.stop()
+        else:
+            poll([build_application(tenant.token) for tenant in cafes])
         
     except Exception as e:
         logger.error(f"Error starting bot: {e}")
         raise
+    finally:
+        for tenant in tenants.tenants():
+            tenant.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
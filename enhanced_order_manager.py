@@ -1,92 +1,285 @@
 """
 Enhanced Order management for the Telegram Cafe Bot
 Handles order creation, storage, and status tracking
+
+Orders are kept in an append-only JSON-lines log: every new order or status
+change appends the full order record as one line, and an in-memory index
+maps each order ID to the offset of its latest record. A background thread
+compacts the log, dropping superseded records.
+
+Each line starts with the CRC32 of its JSON, so a torn or corrupt record is
+detected instead of parsed. Writes return once the record is on disk, but
+writers that arrive together share a single fsync (group commit).
+
+The index, compaction and torn-tail repair all assume one OrderManager is
+the only writer of its log, so it holds an exclusive lock on
+``{orders_file}.lock`` while open; a second manager of the same file, in
+this process or another, fails to start.
 """
 
+import fcntl
 import json
 import logging
 import os
-import uuid
+import threading
+import time
+import zlib
 from datetime import datetime
-from enhanced_config import ORDERS_FILE, ORDER_STATUS
+from enhanced_config import (
+    ORDERS_FILE, ORDER_STATUS, ORDERS_COMPACT_INTERVAL, ORDERS_COMPACT_MIN_STALE,
+    ORDERS_COMMIT_WINDOW
+)
+from order_ids import ORDER_ID_LENGTH, new_order_id
+
+# Fresh IDs drawn before giving up when the generated ones are taken
+ORDER_ID_ATTEMPTS = 3
 
 logger = logging.getLogger(__name__)
 
+def build_order(order_id, order_data):
+    """Create the record of a new order from the handlers' order data"""
+    now = datetime.now().isoformat()
+    return {
+        'id': order_id,
+        'user_id': order_data.get('user_id'),
+        'username': order_data.get('username'),
+        'first_name': order_data.get('first_name'),
+        'last_name': order_data.get('last_name'),
+        'phone_number': order_data.get('phone_number'),
+        'contact_info': order_data.get('contact_info'),
+        'items': order_data.get('items', {}),
+        'status': ORDER_STATUS['PENDING'],
+        'created_at': now,
+        'updated_at': now,
+        'notes': order_data.get('notes', ''),
+        'total_cents': order_data.get('total_cents', 0),
+        'total_amount': order_data.get('total_amount', 0)
+    }
+
+def encode_record(order):
+    """Encode an order as a checksummed log line"""
+    payload = json.dumps(order, ensure_ascii=False).encode('utf-8')
+    return b'%08x %s\n' % (zlib.crc32(payload), payload)
+
+def decode_record(line):
+    """Decode a log line, raising ValueError if it is torn or corrupt"""
+    if line.startswith(b'{'):
+        # Written before records were checksummed
+        return json.loads(line)
+    checksum, _, payload = line.rstrip(b'\n').partition(b' ')
+    if len(checksum) != 8 or int(checksum, 16) != zlib.crc32(payload):
+        raise ValueError("checksum mismatch")
+    return json.loads(payload)
+
+def _fsync_directory(path):
+    """Make a rename in the directory of ``path`` durable"""
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+class OrderLogLocked(RuntimeError):
+    """Raised when another OrderManager already has the orders log open"""
+
 class OrderManager:
     """Manages customer orders"""
     
-    def __init__(self):
+    def __init__(self, orders_file=ORDERS_FILE, compact_interval=ORDERS_COMPACT_INTERVAL,
+                 commit_window=ORDERS_COMMIT_WINDOW):
+        self.orders_file = orders_file
+        self.compact_interval = compact_interval
+        self.commit_window = commit_window
+        self._lock = threading.Lock()
+        # order_id -> offset of its latest record in the log
+        self._index = {}
+        # Records superseded by a later record of the same order
+        self._stale = 0
+        # Group commit: records appended / known to be on disk, and whether
+        # a writer is currently syncing on behalf of the others
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self._sync_done = threading.Condition()
+        self.fsyncs = 0
+        self._lock_file = self._acquire_log_lock()
         self._initialize_orders_file()
+        self._writer = open(self.orders_file, 'ab')
+        self._reader = open(self.orders_file, 'rb')
+        
+        self._stopped = threading.Event()
+        self._compactor = threading.Thread(target=self._run_compaction, name="order-compaction", daemon=True)
+        self._compactor.start()
+    
+    def _acquire_log_lock(self):
+        """Become the only writer of the orders log, or raise OrderLogLocked"""
+        lock_file = open(f"{self.orders_file}.lock", 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise OrderLogLocked(
+                f"Orders log {self.orders_file} is already open by another order manager; "
+                "give every tenant and process its own ORDERS_FILE"
+            )
+        return lock_file
     
     def _initialize_orders_file(self):
-        """Initialize orders file if it doesn't exist"""
+        """Create or migrate the orders log and build its index"""
         try:
-            if not os.path.exists(ORDERS_FILE):
-                with open(ORDERS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump({}, f)
+            legacy_file = os.path.splitext(self.orders_file)[0] + '.json'
+            if not os.path.exists(self.orders_file) and legacy_file != self.orders_file and os.path.exists(legacy_file):
+                self._migrate(legacy_file)
+            elif self._is_legacy(self.orders_file):
+                self._migrate(self.orders_file)
+            elif not os.path.exists(self.orders_file):
+                open(self.orders_file, 'ab').close()
                 logger.info("Orders file initialized")
+            
+            self._build_index()
         except Exception as e:
             logger.error(f"Error initializing orders file: {e}")
     
-    def _load_orders(self):
-        """Load orders from file"""
+    @staticmethod
+    def _is_legacy(path):
+        """Check whether a file is an old pretty-printed {order_id: order} JSON file"""
         try:
-            with open(ORDERS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(path, 'r', encoding='utf-8') as f:
+                first_line = f.readline().strip()
         except FileNotFoundError:
-            logger.error("Orders file not found")
-            return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing orders JSON: {e}")
-            return {}
-        except Exception as e:
-            logger.error(f"Error loading orders: {e}")
-            return {}
+            return False
+        return first_line in ('{', '{}')
+    
+    def _migrate(self, legacy_file):
+        """Convert an old {order_id: order} JSON file into the orders log"""
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            orders = json.load(f)
+        self._write_log(orders.values())
+        logger.info(f"Migrated {len(orders)} orders from {legacy_file}")
+    
+    def _write_log(self, orders):
+        """Atomically replace the log with the given orders"""
+        temp_file = f"{self.orders_file}.tmp"
+        with open(temp_file, 'wb') as f:
+            for order in orders:
+                f.write(encode_record(order))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.orders_file)
+        _fsync_directory(self.orders_file)
     
-    def _save_orders(self, orders):
-        """Save orders to file"""
+    def _build_index(self):
+        """Scan the log once and index the latest record of every order"""
+        index = {}
+        stale = 0
+        offset = 0
+        size = os.path.getsize(self.orders_file)
+        with open(self.orders_file, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError("incomplete record")
+                    order_id = decode_record(line)['id']
+                except (ValueError, KeyError) as e:
+                    if offset + len(line) == size:
+                        # Torn last record of an interrupted write; appends go after it
+                        logger.warning(f"Dropping torn order record at offset {offset}: {e}")
+                        break
+                    logger.error(f"Skipping unreadable order record at offset {offset}: {e}")
+                else:
+                    stale += order_id in index
+                    index[order_id] = offset
+                offset += len(line)
+        if offset != size:
+            os.truncate(self.orders_file, offset)
+        self._index = index
+        self._stale = stale
+        # New IDs continue after the newest stored one, even if the clock went back
+        newest = max((order_id for order_id in index if len(order_id) == ORDER_ID_LENGTH), default=None)
+        if newest is not None:
+            new_order_id.observe(newest)
+    
+    def _append(self, order):
+        """Append an order record, point the index at it and wait until it is on disk"""
+        record = encode_record(order)
+        with self._lock:
+            offset = self._writer.seek(0, os.SEEK_END)
+            self._writer.write(record)
+            self._writer.flush()
+            if order['id'] in self._index:
+                self._stale += 1
+            self._index[order['id']] = offset
+            self._appended += 1
+            sequence = self._appended
+        self._wait_durable(sequence)
+    
+    def _wait_durable(self, sequence):
+        """Wait until the first ``sequence`` records are synced to disk
+        
+        The first waiter becomes the leader: it waits commit_window for
+        other writers to append, then syncs everything appended so far
+        with one fsync. Writers arriving meanwhile wait for that sync, or
+        lead the next one if they appended after it started.
+        """
+        with self._sync_done:
+            while self._synced < sequence:
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._sync_done.wait()
+            else:
+                return
+        
+        synced = self._synced
         try:
-            with open(ORDERS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(orders, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Error saving orders: {e}")
+            if self.commit_window:
+                time.sleep(self.commit_window)
+            with self._lock:
+                target = self._appended
+                # A duplicate keeps the file open even if compaction swaps it
+                fd = os.dup(self._writer.fileno())
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self.fsyncs += 1
+            synced = target
+        finally:
+            with self._sync_done:
+                self._synced = max(self._synced, synced)
+                self._syncing = False
+                self._sync_done.notify_all()
+    
+    def _read(self, order_id):
+        """Read the latest record of an order, or None"""
+        with self._lock:
+            offset = self._index.get(order_id)
+            if offset is None:
+                return None
+            self._reader.seek(offset)
+            line = self._reader.readline()
+        return decode_record(line)
     
     def create_order(self, order_data):
         """Create a new order"""
         try:
-            orders = self._load_orders()
-            
-            # Generate unique order ID
-            order_id = str(uuid.uuid4())[:8].upper()
-            
-            # Ensure unique ID
-            while order_id in orders:
-                order_id = str(uuid.uuid4())[:8].upper()
-            
-            # Create order record
-            order = {
-                'id': order_id,
-                'user_id': order_data.get('user_id'),
-                'username': order_data.get('username'),
-                'first_name': order_data.get('first_name'),
-                'last_name': order_data.get('last_name'),
-                'phone_number': order_data.get('phone_number'),
-                'contact_info': order_data.get('contact_info'),
-                'items': order_data.get('items', {}),
-                'status': ORDER_STATUS['PENDING'],
-                'created_at': datetime.now().isoformat(),
-                'updated_at': datetime.now().isoformat(),
-                'notes': order_data.get('notes', ''),
-                'total_amount': order_data.get('total_amount', 0)
-            }
+            # IDs are unique by construction; the O(1) index check only
+            # catches another process using the same ORDER_ID_NODE
+            for _ in range(ORDER_ID_ATTEMPTS):
+                order_id = new_order_id()
+                if order_id not in self._index:
+                    break
+                logger.warning(f"Order ID {order_id} is taken, check ORDER_ID_NODE")
+            else:
+                raise RuntimeError("no free order ID")
+            order = build_order(order_id, order_data)
             
             # Save order
-            orders[order_id] = order
-            self._save_orders(orders)
+            self._append(order)
             
             logger.info(f"Created order {order_id} for user {order_data.get('user_id')}")
             return order_id
-            
+        
         except Exception as e:
             logger.error(f"Error creating order: {e}")
             return None
@@ -94,8 +287,7 @@ class OrderManager:
     def get_order(self, order_id):
         """Get order by ID"""
         try:
-            orders = self._load_orders()
-            return orders.get(order_id)
+            return self._read(order_id)
         except Exception as e:
             logger.error(f"Error getting order {order_id}: {e}")
             return None
@@ -107,18 +299,81 @@ class OrderManager:
                 logger.error(f"Invalid order status: {status}")
                 return False
             
-            orders = self._load_orders()
+            order = self._read(order_id)
             
-            if order_id in orders:
-                orders[order_id]['status'] = status
-                orders[order_id]['updated_at'] = datetime.now().isoformat()
-                self._save_orders(orders)
+            if order:
+                order['status'] = status
+                order['updated_at'] = datetime.now().isoformat()
+                self._append(order)
                 
                 logger.info(f"Updated order {order_id} status to {status}")
                 return True
             
             return False
-            
+        
         except Exception as e:
             logger.error(f"Error updating order status: {e}")
-            return False
\ No newline at end of file
+            return False
+    
+    def compact(self):
+        """Rewrite the log with only the latest record of every order
+        
+        Live records are copied without holding the lock; only records
+        appended in the meantime are copied, and the files swapped, under it.
+        """
+        with self._lock:
+            index = dict(self._index)
+            end = self._writer.seek(0, os.SEEK_END)
+            stale = self._stale
+        
+        temp_file = f"{self.orders_file}.compact"
+        new_index = {}
+        with open(self.orders_file, 'rb') as source, open(temp_file, 'wb') as target:
+            for order_id, offset in sorted(index.items(), key=lambda entry: entry[1]):
+                source.seek(offset)
+                new_index[order_id] = target.tell()
+                target.write(source.readline())
+            
+            with self._lock:
+                source.seek(end)
+                for line in source:
+                    order_id = decode_record(line)['id']
+                    new_index[order_id] = target.tell()
+                    target.write(line)
+                target.flush()
+                os.fsync(target.fileno())
+                
+                self._writer.close()
+                self._reader.close()
+                os.replace(temp_file, self.orders_file)
+                _fsync_directory(self.orders_file)
+                self._writer = open(self.orders_file, 'ab')
+                self._reader = open(self.orders_file, 'rb')
+                self._index = new_index
+                self._stale = max(0, self._stale - stale)
+                appended = self._appended
+        
+        # Everything appended so far went to disk with the compacted log
+        with self._sync_done:
+            self._synced = max(self._synced, appended)
+            self._sync_done.notify_all()
+        
+        logger.info(f"Compacted orders log: dropped {stale} superseded records")
+        return stale
+    
+    def _run_compaction(self):
+        while not self._stopped.wait(self.compact_interval):
+            if self._stale >= max(ORDERS_COMPACT_MIN_STALE, len(self._index)):
+                try:
+                    self.compact()
+                except Exception as e:
+                    logger.error(f"Error compacting orders log: {e}")
+    
+    def close(self):
+        """Stop background compaction and close the log"""
+        self._stopped.set()
+        self._compactor.join()
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+        self._lock_file.close()
@@ -0,0 +1,126 @@
+"""
+Time-based expiry for in-memory state of the Telegram Cafe Bot
+Used for abandoned carts and stale conversation states
+"""
+
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiringDict:
+    """Mapping whose entries expire ``ttl`` seconds after their last write
+
+    Deadlines live in a min-heap with one live entry per key, tagged with
+    a sequence number. Writes only update the key's deadline; when its heap
+    entry comes due, a key that was written again in the meantime is pushed
+    back with its new deadline. Entries of deleted keys, and of keys stored
+    again after a delete, no longer match their key's sequence number and
+    are dropped when popped; the heap is rebuilt once they outnumber the
+    live ones. A sweep therefore pops only expired or rescheduled keys
+    instead of scanning every entry, and runs on every access.
+
+    ``on_expire(key, value)`` is called for every expired entry.
+    """
+
+    def __init__(self, ttl: float, name: str = "entries",
+                 on_expire: Optional[Callable[[Hashable, Any], None]] = None):
+        self.ttl = ttl
+        self.name = name
+        self.on_expire = on_expire
+        self.evictions = 0
+        self._data: Dict[Hashable, Any] = {}
+        self._deadlines: Dict[Hashable, float] = {}
+        # Deadline and sequence number of each key's live heap entry
+        self._scheduled: Dict[Hashable, Tuple[float, int]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+
+    def _schedule(self, key: Hashable, deadline: float) -> None:
+        sequence = next(self._counter)
+        self._scheduled[key] = (deadline, sequence)
+        heapq.heappush(self._heap, (deadline, sequence, key))
+
+    def _forget(self, key: Hashable) -> None:
+        """Drop the deadline of a deleted key, compacting the heap if needed"""
+        self._deadlines.pop(key, None)
+        self._scheduled.pop(key, None)
+        if len(self._heap) > 2 * len(self._scheduled) + 64:
+            self._heap = [(deadline, sequence, key) for key, (deadline, sequence) in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+    def sweep(self, now: float = None) -> int:
+        """Evict every entry whose deadline has passed"""
+        now = time.monotonic() if now is None else now
+        heap = self._heap
+        expired = 0
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            scheduled = self._scheduled.get(key)
+            if scheduled is None or scheduled[1] != sequence:
+                # Deleted, or deleted and stored again, since it was scheduled
+                continue
+            deadline = self._deadlines[key]
+            if deadline > now:
+                self._schedule(key, deadline)
+                continue
+            del self._deadlines[key]
+            del self._scheduled[key]
+            value = self._data.pop(key)
+            expired += 1
+            if self.on_expire is not None:
+                self.on_expire(key, value)
+        if expired:
+            self.evictions += expired
+            logger.info(f"Expired {expired} {self.name}")
+        return expired
+
+    def touch(self, key: Hashable) -> None:
+        """Restart the expiry timer of an existing entry"""
+        if key in self._data:
+            self._deadlines[key] = time.monotonic() + self.ttl
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store an entry that expires in ``ttl`` seconds (default: self.ttl)"""
+        self.sweep()
+        deadline = time.monotonic() + (self.ttl if ttl is None else ttl)
+        scheduled = self._scheduled.get(key)
+        if scheduled is None or deadline < scheduled[0]:
+            self._schedule(key, deadline)
+        self._data[key] = value
+        self._deadlines[key] = deadline
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.put(key, value)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        self.sweep()
+        return self._data[key]
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._data[key]
+        self._forget(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        self.sweep()
+        return key in self._data
+
+    def __len__(self) -> int:
+        self.sweep()
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        self.sweep()
+        return iter(list(self._data))
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        self.sweep()
+        return self._data.get(key, default)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        self._forget(key)
+        return self._data.pop(key, default)
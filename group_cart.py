@@ -0,0 +1,265 @@
+"""
+Shared group carts for the Enhanced Telegram Cafe Bot
+Lets the members of a group chat (a table) fill one cart together
+
+Members change quantities by deltas (see PNCounter), so concurrent taps
+add up. With a store, group carts are written behind to SQLite like user
+carts and survive restarts.
+"""
+
+import logging
+import time
+from enhanced_cart_manager import BaseCartManager, EMPTY_CART
+from enhanced_config import MAX_CART_ITEMS, ORDER_TIMEOUT
+from expiry import ExpiringDict
+
+logger = logging.getLogger(__name__)
+
+class PNCounter:
+    """Quantity changed by many members, as a PN-counter
+
+    Each member only grows its own total of increments and of decrements,
+    so the counter records who added and who removed what. The value is
+    kept up to date by ``change``.
+    """
+
+    __slots__ = ('added', 'removed', 'value')
+
+    def __init__(self):
+        self.added = {}
+        self.removed = {}
+        self.value = 0
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a counter from ``to_dict`` output"""
+        counter = cls()
+        # JSON turned the member ids (Telegram user ids) into strings
+        counter.added = {int(member): count for member, count in data['added'].items()}
+        counter.removed = {int(member): count for member, count in data['removed'].items()}
+        counter.value = sum(counter.added.values()) - sum(counter.removed.values())
+        return counter
+
+    def to_dict(self):
+        """Get the per-member totals, for storage"""
+        return {'added': self.added, 'removed': self.removed}
+
+    def change(self, member, delta):
+        """Apply a member's change, never taking the value below zero"""
+        if delta > 0:
+            self.added[member] = self.added.get(member, 0) + delta
+        elif delta < 0:
+            delta = -min(-delta, self.value)
+            if delta:
+                self.removed[member] = self.removed.get(member, 0) - delta
+        self.value += delta
+
+class GroupCart:
+    """Cart shared by the members of a chat, one PNCounter per item
+
+    Reads behave like a Cart, so the cart views and order code work on it
+    unchanged. Like a Cart it keeps its line and item counts and its
+    subtotal up to date on every change, so reading them doesn't walk the
+    lines.
+    """
+
+    __slots__ = ('lines', 'created_at', 'updated_at', 'size', 'count', 'subtotal', 'prices')
+
+    def __init__(self, now=None):
+        now = time.time() if now is None else now
+        self.lines = {}
+        self.created_at = now
+        self.updated_at = now
+        # Lines with a quantity, and the sum of their quantities
+        self.size = 0
+        self.count = 0
+        self.subtotal = 0
+        # Prices of the menu snapshot the subtotal was computed with
+        self.prices = None
+
+    @classmethod
+    def from_counters(cls, counters, created_at, updated_at):
+        """Rebuild a cart from ``counters`` output"""
+        cart = cls(created_at)
+        cart.updated_at = updated_at
+        for item_id, data in counters.items():
+            counter = cart.lines[item_id] = PNCounter.from_dict(data)
+            cart.size += bool(counter.value)
+            cart.count += counter.value
+        return cart
+
+    def __len__(self):
+        return self.size
+
+    def counters(self):
+        """Get the per-member counters of every line, for storage"""
+        return {item_id: counter.to_dict() for item_id, counter in self.lines.items()}
+
+    def get(self, item_id):
+        """Get the quantity of an item, 0 if it is not in the cart"""
+        counter = self.lines.get(item_id)
+        return counter.value if counter is not None else 0
+
+    def change(self, member, item_id, delta):
+        """Change the quantity of an item on behalf of a member"""
+        counter = self.lines.get(item_id)
+        if counter is None:
+            counter = self.lines[item_id] = PNCounter()
+        previous = counter.value
+        counter.change(member, delta)
+        change = counter.value - previous
+        self.size += bool(counter.value) - bool(previous)
+        self.count += change
+        if self.prices is not None:
+            self.subtotal += change * self.prices.get(item_id, 0)
+        self.updated_at = time.time()
+
+    def set(self, member, item_id, quantity):
+        """Set the quantity of an item on behalf of a member; 0 removes it"""
+        self.change(member, item_id, max(0, quantity) - self.get(item_id))
+
+    def items(self):
+        """Iterate over (item_id, quantity) lines"""
+        for item_id, counter in self.lines.items():
+            quantity = counter.value
+            if quantity:
+                yield item_id, quantity
+
+    def to_dict(self):
+        """Get the lines as an {item_id: quantity} dict"""
+        return dict(self.items())
+
+    def total(self, menu):
+        """Get the price of the cart in integer cents
+
+        The cart is re-priced only when ``menu`` is a different snapshot
+        than the one it was last priced with.
+        """
+        prices = menu.prices
+        if self.prices is not prices:
+            self.subtotal = sum(prices.get(item_id, 0) * quantity for item_id, quantity in self.items())
+            self.prices = prices
+        return self.subtotal
+
+class GroupCartManager(BaseCartManager):
+    """Manages the shared carts of group chats
+
+    Carts are keyed by chat; every method takes an owner of the form
+    ``(chat_id, member_user_id)``, so changes are recorded per member.
+    Sharding routes group chats by chat (see sharding.routing_key), so
+    each chat's cart lives in exactly one process.
+    """
+
+    def __init__(self, ttl=ORDER_TIMEOUT, store=None, owns=None):
+        # chat_id -> GroupCart, dropped after ``ttl`` seconds without changes
+        self.carts = ExpiringDict(ttl, name="group carts", on_expire=self._on_expire)
+        # Optional durable copy of the carts (see cart_store.py), written behind
+        self.store = store
+        # In sharded mode, tells which chats' carts this process holds
+        self.owns = owns
+        if store is not None:
+            self._restore()
+
+    def _restore(self):
+        """Load the carts of the store, dropping those that already expired"""
+        now = time.time()
+        restored = 0
+        for chat_id, counters, created_at, updated_at in self.store.load():
+            if self.owns is not None and not self.owns(chat_id):
+                continue
+            remaining = self.carts.ttl - (now - updated_at)
+            if remaining <= 0:
+                self.store.delete(chat_id)
+                continue
+            self.carts.put(chat_id, GroupCart.from_counters(counters, created_at, updated_at), remaining)
+            restored += 1
+        logger.info(f"Restored {restored} group carts")
+
+    def _on_expire(self, chat_id, cart):
+        if self.store is not None:
+            self.store.delete(chat_id)
+
+    def close(self):
+        """Write pending cart changes to the store"""
+        if self.store is not None:
+            self.store.close()
+
+    def get_cart(self, owner):
+        """Get the shared cart of a chat"""
+        chat_id, _ = owner
+        return self.carts.get(chat_id, EMPTY_CART)
+
+    def _change(self, owner, item_id, quantity=None, delta=None):
+        chat_id, member = owner
+        if delta is not None and delta <= 0 and not self.get_cart(owner).get(item_id):
+            # Nothing to take away
+            return False
+
+        cart = self.carts.get(chat_id)
+        if cart is None:
+            cart = self.carts[chat_id] = GroupCart()
+
+        # Check cart limits
+        if not cart.get(item_id) and len(cart) >= MAX_CART_ITEMS:
+            logger.warning(f"Cart limit exceeded for chat {chat_id}")
+            return False
+
+        if delta is not None:
+            cart.change(member, item_id, delta)
+        else:
+            cart.set(member, item_id, quantity)
+        self.carts.touch(chat_id)
+        if self.store is not None:
+            self.store.save(chat_id, cart, cart.counters())
+        return True
+
+    def add_item(self, owner, item_id, quantity=1):
+        """Add item to the chat's cart; a negative quantity takes it away"""
+        try:
+            if not self._change(owner, item_id, delta=quantity):
+                return False
+            logger.info(f"Added item {item_id} (qty: {quantity}) to group cart {owner}")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding item to group cart {owner}: {e}")
+            return False
+
+    def remove_item(self, owner, item_id):
+        """Remove item from the chat's cart"""
+        try:
+            if not self.get_cart(owner).get(item_id):
+                return False
+            self._change(owner, item_id, quantity=0)
+            logger.info(f"Removed item {item_id} from group cart {owner}")
+            return True
+        except Exception as e:
+            logger.error(f"Error removing item from group cart {owner}: {e}")
+            return False
+
+    def update_quantity(self, owner, item_id, quantity):
+        """Update item quantity in the chat's cart"""
+        try:
+            if quantity <= 0:
+                return self.remove_item(owner, item_id)
+            if not self._change(owner, item_id, quantity=quantity):
+                return False
+            logger.info(f"Updated item {item_id} quantity to {quantity} in group cart {owner}")
+            return True
+        except Exception as e:
+            logger.error(f"Error updating quantity in group cart {owner}: {e}")
+            return False
+
+    def clear_cart(self, owner):
+        """Clear the chat's cart"""
+        try:
+            chat_id, _ = owner
+            if chat_id in self.carts:
+                del self.carts[chat_id]
+                if self.store is not None:
+                    self.store.delete(chat_id)
+                logger.info(f"Cleared group cart of chat {chat_id}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error clearing group cart {owner}: {e}")
+            return False
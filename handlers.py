@@ -8,11 +8,11 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 
+import config
 from config import (
-    WELCOME_MESSAGE, HELP_MESSAGE, CAFE_PHONE, CAFE_EMAIL, 
-    CAFE_ADDRESS, CAFE_HOURS, CAFE_WEBSITE, CAFE_INSTAGRAM,
-    ORDER_PHONE, ORDER_EMAIL, CAFE_NAME
+    CAFE_PHONE, CAFE_EMAIL, CAFE_ADDRESS, ORDER_PHONE, ORDER_EMAIL
 )
+from screens import Screen, ScreenRegistry
 from utils import (
     load_menu_data, create_main_menu_keyboard, create_category_keyboard,
     create_item_keyboard, format_item_message, format_category_message,
@@ -22,27 +22,128 @@ from utils import (
 
 logger = logging.getLogger(__name__)
 
+def _build_screens(cfg) -> dict:
+    """Build the static screens from the config module"""
+    md = ParseMode.MARKDOWN
+    return {
+        # Main menu screens get the catalog keyboard from create_main_menu_keyboard()
+        "welcome": Screen(cfg.WELCOME_MESSAGE, md),
+        "menu": Screen("""
+🍽️ **Our Menu** 🍽️
+
+Explore our delicious offerings by category:
+• Fresh coffee and specialty drinks
+• Hearty meals and light bites  
+• Sweet pastries and desserts
+
+Choose a category to see our full selection!
+""", md),
+        "main_menu": Screen("""
+🍽️ **Welcome to Our Menu!** 🍽️
+
+Choose a category below to explore our delicious offerings:
+
+✨ Fresh ingredients, made with love
+💫 Perfect for dine-in, takeout, or delivery
+🎯 Quality food at great prices
+""", md),
+        "short_menu": Screen("🍽️ **Our Menu** 🍽️\n\nChoose a category:", md),
+        "help": Screen(cfg.HELP_MESSAGE, md, create_back_keyboard()),
+        "contact": Screen(f"""
+📞 **Contact {cfg.CAFE_NAME}** 📞
+
+**Phone:** {cfg.CAFE_PHONE}
+**Email:** {cfg.CAFE_EMAIL}
+**Website:** {cfg.CAFE_WEBSITE}
+**Instagram:** {cfg.CAFE_INSTAGRAM}
+
+**Address:**
+{cfg.CAFE_ADDRESS}
+
+We'd love to hear from you! 💌
+""", md, create_contact_keyboard()),
+        "location": Screen(f"""
+📍 **Find {cfg.CAFE_NAME}** 📍
+
+**Address:**
+{cfg.CAFE_ADDRESS}
+
+{cfg.CAFE_HOURS}
+
+🚗 Parking available
+🚌 Public transit accessible
+♿ Wheelchair accessible
+
+See you soon! ✨
+""", md, create_back_keyboard()),
+        "order": Screen(f"""
+📱 **Ready to Order?** 📱
+
+**Call to Order:**
+📞 {cfg.ORDER_PHONE}
+
+**Email Your Order:**
+📧 {cfg.ORDER_EMAIL}
+
+**Order Information:**
+• Please specify items and quantities
+• Include your contact information
+• Mention pickup or delivery preference
+• We'll confirm your order promptly!
+
+🎉 Thank you for choosing {cfg.CAFE_NAME}!
+""", md, create_order_keyboard()),
+        "call_order": Screen(
+            f"📞 **Call to Order**\n\n{cfg.ORDER_PHONE}\n\nTap the number to call on mobile devices!",
+            md, create_back_keyboard()
+        ),
+        "email_order": Screen(
+            f"📧 **Email Your Order**\n\n{cfg.ORDER_EMAIL}\n\nSend us your order details and we'll get back to you!",
+            md, create_back_keyboard()
+        ),
+        "call_cafe": Screen(
+            f"📞 **Call Us**\n\n{cfg.CAFE_PHONE}\n\nTap the number to call on mobile devices!",
+            md, create_contact_keyboard()
+        ),
+        "email_cafe": Screen(
+            f"📧 **Email Us**\n\n{cfg.CAFE_EMAIL}\n\nWe'd love to hear from you!",
+            md, create_contact_keyboard()
+        ),
+        "website": Screen(
+            f"🌐 **Visit Our Website**\n\n{cfg.CAFE_WEBSITE}\n\nDiscover more about our story and offerings!",
+            md, create_contact_keyboard()
+        ),
+        "instagram": Screen(
+            f"📱 **Follow Us on Instagram**\n\n{cfg.CAFE_INSTAGRAM}\n\nSee our latest creations and cafe life!",
+            md, create_contact_keyboard()
+        ),
+    }
+
+screens = ScreenRegistry(config, _build_screens)
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /start command with welcome message and cafe interior photo"""
     try:
         menu_data = load_menu_data()
         cafe_images = menu_data.get("cafe_images", [])
         
+        screen = screens["welcome"]
+        
         # Send a random cafe interior photo with welcome message
         if cafe_images:
             photo_url = random.choice(cafe_images)
             await update.message.reply_photo(
                 photo=photo_url,
-                caption=WELCOME_MESSAGE,
+                caption=screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
         else:
             # Fallback if no images available
             await update.message.reply_text(
-                WELCOME_MESSAGE,
+                screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
             
     except Exception as e:
@@ -55,21 +156,11 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 async def menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /menu command"""
     try:
-        message = """
-🍽️ **Our Menu** 🍽️
-
-Explore our delicious offerings by category:
-• Fresh coffee and specialty drinks
-• Hearty meals and light bites  
-• Sweet pastries and desserts
-
-Choose a category to see our full selection!
-"""
-        
+        screen = screens["menu"]
         await update.message.reply_text(
-            message,
+            screen.text,
             reply_markup=create_main_menu_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -82,10 +173,11 @@ Choose a category to see our full selection!
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /help command"""
     try:
+        screen = screens["help"]
         await update.message.reply_text(
-            HELP_MESSAGE,
-            reply_markup=create_back_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -98,24 +190,11 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def contact_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /contact command"""
     try:
-        contact_message = f"""
-📞 **Contact {CAFE_NAME}** 📞
-
-**Phone:** {CAFE_PHONE}
-**Email:** {CAFE_EMAIL}
-**Website:** {CAFE_WEBSITE}
-**Instagram:** {CAFE_INSTAGRAM}
-
-**Address:**
-{CAFE_ADDRESS}
-
-We'd love to hear from you! 💌
-"""
-        
+        screen = screens["contact"]
         await update.message.reply_text(
-            contact_message,
-            reply_markup=create_contact_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -128,25 +207,11 @@ We'd love to hear from you! 💌
 async def location_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /location command"""
     try:
-        location_message = f"""
-📍 **Find {CAFE_NAME}** 📍
-
-**Address:**
-{CAFE_ADDRESS}
-
-{CAFE_HOURS}
-
-🚗 Parking available
-🚌 Public transit accessible
-♿ Wheelchair accessible
-
-See you soon! ✨
-"""
-        
+        screen = screens["location"]
         await update.message.reply_text(
-            location_message,
-            reply_markup=create_back_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -169,6 +234,9 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
         elif callback_data.startswith("category_"):
             category = callback_data.replace("category_", "")
             await handle_category_selection(query, category)
+        elif callback_data.startswith("catpage_"):
+            _, page, category = callback_data.split("_", 2)
+            await handle_category_selection(query, category, int(page))
         elif callback_data.startswith("item_"):
             item_id = callback_data.replace("item_", "")
             await handle_item_selection(query, item_id)
@@ -207,30 +275,22 @@ async def handle_callback_query(update: Update, context: ContextTypes.DEFAULT_TY
 async def handle_main_menu(query) -> None:
     """Handle main menu callback"""
     try:
-        main_menu_text = """
-🍽️ **Welcome to Our Menu!** 🍽️
-
-Choose a category below to explore our delicious offerings:
-
-✨ Fresh ingredients, made with love
-💫 Perfect for dine-in, takeout, or delivery
-🎯 Quality food at great prices
-"""
+        screen = screens["main_menu"]
         
         # Check if current message has a photo
         if query.message.photo:
             # If it's a photo message, edit the caption
             await query.edit_message_caption(
-                caption=main_menu_text,
+                caption=screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
         else:
             # If it's a text message, edit the text
             await query.edit_message_text(
-                main_menu_text,
+                screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
             
     except Exception as e:
@@ -238,16 +298,17 @@ Choose a category below to explore our delicious offerings:
         # Fallback: delete current message and send a new one
         try:
             await query.message.delete()
+            screen = screens["short_menu"]
             await query.message.chat.send_message(
-                "🍽️ **Our Menu** 🍽️\n\nChoose a category:",
+                screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
         except:
             pass
 
-async def handle_category_selection(query, category: str) -> None:
-    """Handle category selection"""
+async def handle_category_selection(query, category: str, page: int = 0) -> None:
+    """Handle category selection and category page changes"""
     try:
         category_message = format_category_message(category)
         
@@ -257,14 +318,14 @@ async def handle_category_selection(query, category: str) -> None:
             await query.message.delete()
             await query.message.chat.send_message(
                 category_message,
-                reply_markup=create_category_keyboard(category),
+                reply_markup=create_category_keyboard(category, page),
                 parse_mode=ParseMode.MARKDOWN
             )
         else:
             # Edit text message
             await query.edit_message_text(
                 category_message,
-                reply_markup=create_category_keyboard(category),
+                reply_markup=create_category_keyboard(category, page),
                 parse_mode=ParseMode.MARKDOWN
             )
         
@@ -274,7 +335,7 @@ async def handle_category_selection(query, category: str) -> None:
             await query.message.delete()
             await query.message.chat.send_message(
                 f"Category: {category.title()}",
-                reply_markup=create_category_keyboard(category)
+                reply_markup=create_category_keyboard(category, page)
             )
         except:
             pass
@@ -343,23 +404,23 @@ async def handle_item_selection(query, item_id: str) -> None:
 async def handle_back_to_category(query, context) -> None:
     """Handle back to category navigation"""
     try:
-        main_menu_text = "🍽️ **Our Menu** 🍽️\n\nChoose a category:"
+        screen = screens["short_menu"]
         
         # Check if current message has a photo
         if query.message.photo:
             # Delete photo message and send new text message
             await query.message.delete()
             await query.message.chat.send_message(
-                main_menu_text,
+                screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
         else:
             # Edit text message
             await query.edit_message_text(
-                main_menu_text,
+                screen.text,
                 reply_markup=create_main_menu_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                parse_mode=screen.parse_mode
             )
         
     except Exception as e:
@@ -369,35 +430,23 @@ async def handle_back_to_category(query, context) -> None:
 async def handle_contact_info(query) -> None:
     """Handle contact information display"""
     try:
-        contact_message = f"""
-📞 **Contact {CAFE_NAME}** 📞
-
-**Phone:** {CAFE_PHONE}
-**Email:** {CAFE_EMAIL}
-**Website:** {CAFE_WEBSITE}
-**Instagram:** {CAFE_INSTAGRAM}
-
-**Address:**
-{CAFE_ADDRESS}
-
-We'd love to hear from you! 💌
-"""
+        screen = screens["contact"]
         
         # Check if current message has a photo
         if query.message.photo:
             # Delete photo message and send new text message
             await query.message.delete()
             await query.message.chat.send_message(
-                contact_message,
-                reply_markup=create_contact_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                screen.text,
+                reply_markup=screen.reply_markup,
+                parse_mode=screen.parse_mode
             )
         else:
             # Edit text message
             await query.edit_message_text(
-                contact_message,
-                reply_markup=create_contact_keyboard(),
-                parse_mode=ParseMode.MARKDOWN
+                screen.text,
+                reply_markup=screen.reply_markup,
+                parse_mode=screen.parse_mode
             )
         
     except Exception as e:
@@ -414,25 +463,11 @@ We'd love to hear from you! 💌
 async def handle_location_info(query) -> None:
     """Handle location and hours information"""
     try:
-        location_message = f"""
-📍 **Find {CAFE_NAME}** 📍
-
-**Address:**
-{CAFE_ADDRESS}
-
-{CAFE_HOURS}
-
-🚗 Parking available
-🚌 Public transit accessible  
-♿ Wheelchair accessible
-
-See you soon! ✨
-"""
-        
+        screen = screens["location"]
         await query.edit_message_text(
-            location_message,
-            reply_markup=create_back_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -445,28 +480,11 @@ See you soon! ✨
 async def handle_order_info(query) -> None:
     """Handle order information and options"""
     try:
-        order_message = f"""
-📱 **Ready to Order?** 📱
-
-**Call to Order:**
-📞 {ORDER_PHONE}
-
-**Email Your Order:**
-📧 {ORDER_EMAIL}
-
-**Order Information:**
-• Please specify items and quantities
-• Include your contact information
-• Mention pickup or delivery preference
-• We'll confirm your order promptly!
-
-🎉 Thank you for choosing {CAFE_NAME}!
-"""
-        
+        screen = screens["order"]
         await query.edit_message_text(
-            order_message,
-            reply_markup=create_order_keyboard(),
-            parse_mode=ParseMode.MARKDOWN
+            screen.text,
+            reply_markup=screen.reply_markup,
+            parse_mode=screen.parse_mode
         )
         
     except Exception as e:
@@ -515,48 +533,54 @@ We'll have your order ready! 🎉
 
 async def handle_call_order(query) -> None:
     """Handle call to order action"""
+    screen = screens["call_order"]
     await query.edit_message_text(
-        f"📞 **Call to Order**\n\n{ORDER_PHONE}\n\nTap the number to call on mobile devices!",
-        reply_markup=create_back_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
 
 async def handle_email_order(query) -> None:
     """Handle email order action"""
+    screen = screens["email_order"]
     await query.edit_message_text(
-        f"📧 **Email Your Order**\n\n{ORDER_EMAIL}\n\nSend us your order details and we'll get back to you!",
-        reply_markup=create_back_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
 
 async def handle_call_cafe(query) -> None:
     """Handle call cafe action"""
+    screen = screens["call_cafe"]
     await query.edit_message_text(
-        f"📞 **Call Us**\n\n{CAFE_PHONE}\n\nTap the number to call on mobile devices!",
-        reply_markup=create_contact_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
 
 async def handle_email_cafe(query) -> None:
     """Handle email cafe action"""
+    screen = screens["email_cafe"]
     await query.edit_message_text(
-        f"📧 **Email Us**\n\n{CAFE_EMAIL}\n\nWe'd love to hear from you!",
-        reply_markup=create_contact_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
 
 async def handle_website(query) -> None:
     """Handle website link"""
+    screen = screens["website"]
     await query.edit_message_text(
-        f"🌐 **Visit Our Website**\n\n{CAFE_WEBSITE}\n\nDiscover more about our story and offerings!",
-        reply_markup=create_contact_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
 
 async def handle_instagram(query) -> None:
     """Handle Instagram link"""
+    screen = screens["instagram"]
     await query.edit_message_text(
-        f"📱 **Follow Us on Instagram**\n\n{CAFE_INSTAGRAM}\n\nSee our latest creations and cafe life!",
-        reply_markup=create_contact_keyboard(),
-        parse_mode=ParseMode.MARKDOWN
+        screen.text,
+        reply_markup=screen.reply_markup,
+        parse_mode=screen.parse_mode
     )
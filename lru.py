@@ -0,0 +1,59 @@
+"""
+Size-bounded LRU cache used by the Telegram Cafe Bot
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entries"""
+
+    def __init__(self, maxsize: int, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+        self.maxsize = maxsize
+        self.on_evict = on_evict
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it as recently used"""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the oldest entries beyond maxsize"""
+        evicted = []
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False))
+                self.evictions += 1
+        if self.on_evict is not None:
+            for old_key, old_value in evicted:
+                self.on_evict(old_key, old_value)
+
+    def get_or_create(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Get a value, building and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a value without calling on_evict"""
+        with self._lock:
+            return self._data.pop(key, default)
@@ -0,0 +1,269 @@
+"""
+In-memory menu catalog for the Telegram Cafe Bot
+Loads the menu JSON once and hot-reloads it when the file changes
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Any, Optional, Callable, Hashable
+
+from catalog_snapshot import read_snapshot, write_snapshot, snapshot_path
+from enhanced_config import CURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two stat() calls on the menu file
+STAT_INTERVAL = 1.0
+
+
+def parse_price(price: Any) -> int:
+    """Parse a menu price such as "$3.50" into integer cents"""
+    if isinstance(price, bool):
+        return 0
+    if isinstance(price, int):
+        return price * 100
+    try:
+        text = str(price).replace(CURRENCY, '').replace('$', '').replace(',', '').strip()
+        return int((Decimal(text) * 100).to_integral_value())
+    except (InvalidOperation, ValueError):
+        logger.warning(f"Invalid menu price: {price!r}")
+        return 0
+
+
+def format_price(cents: int) -> str:
+    """Format integer cents as a price string, e.g. 350 -> $3.50"""
+    sign = '-' if cents < 0 else ''
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{CURRENCY}{whole}.{fraction:02d}"
+
+
+def _normalize_categories(data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return categories as {key: {name, emoji, description, items}}
+
+    Two menu layouts are in use: the nested one in ``menu_data.json``
+    (``{"categories": {key: {..., "items": [...]}}}``) and the flat one
+    expected by the enhanced bot (``{key: [items]}``).
+    """
+    if isinstance(data.get("categories"), dict):
+        categories = {}
+        for key, category in data["categories"].items():
+            if isinstance(category, dict):
+                categories[key] = category
+        return categories
+
+    categories = {}
+    for key, items in data.items():
+        if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+            categories[key] = {
+                "name": key.title(),
+                "emoji": "🍽️",
+                "description": "",
+                "items": items
+            }
+    return categories
+
+
+class MenuSnapshot:
+    """Immutable view of one version of the menu"""
+
+    def __init__(self, data: Dict[str, Any], version: int, signature=None,
+                 prices: Optional[Dict[str, int]] = None):
+        self.data = data
+        self.version = version
+        self.signature = signature
+        self.categories = _normalize_categories(data)
+        self._cache: Dict[Hashable, Any] = {}
+
+        # Lookup indexes, built once per menu version
+        self.items_by_id: Dict[str, Dict[str, Any]] = {}
+        self.category_by_item_id: Dict[str, str] = {}
+        self.prices: Dict[str, int] = {}
+        for category_key, category in self.categories.items():
+            for item in category.get("items", []):
+                item_id = item.get("id")
+                if item_id is None or item_id in self.items_by_id:
+                    continue
+                self.items_by_id[item_id] = item
+                self.category_by_item_id[item_id] = category_key
+                if prices is not None and item_id in prices:
+                    self.prices[item_id] = prices[item_id]
+                else:
+                    self.prices[item_id] = parse_price(item.get("price", 0))
+
+    def get_item(self, item_id: str) -> Optional[Dict[str, Any]]:
+        """Get a menu item by its ID"""
+        return self.items_by_id.get(item_id)
+
+    def get_category_key(self, item_id: str) -> str:
+        """Get the category key for a given item ID"""
+        return self.category_by_item_id.get(item_id, "")
+
+    def get_price(self, item_id: str) -> int:
+        """Get the price of an item in integer cents"""
+        return self.prices.get(item_id, 0)
+
+    def category_items(self, category_key: str) -> List[Dict[str, Any]]:
+        """Get the items of a category, or an empty list"""
+        return self.categories.get(category_key, {}).get("items", [])
+
+    def category_page(self, category_key: str, page: int, page_size: int):
+        """Get one page of a category as (items, page, page_count)
+
+        Out-of-range page numbers are clamped to the first or last page.
+        """
+        items = self.category_items(category_key)
+        page_count = max(1, -(-len(items) // page_size))
+        page = min(max(page, 0), page_count - 1)
+        start = page * page_size
+        return items[start:start + page_size], page, page_count
+
+    def cached(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """Get a value derived from this menu version, building it on first use
+
+        Use it for immutable objects such as keyboards; they are dropped
+        together with the snapshot when the menu reloads.
+        """
+        value = self._cache.get(key)
+        if value is None:
+            value = self._cache.setdefault(key, build())
+        return value
+
+
+class MenuCatalog:
+    """Process-wide menu catalog with change-detected hot reload"""
+
+    def __init__(self, path: str, stat_interval: float = STAT_INTERVAL, use_snapshot: bool = True):
+        self.path = path
+        self.stat_interval = stat_interval
+        self.use_snapshot = use_snapshot
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._version = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _stat_signature(self):
+        """Return a cheap (mtime, size) signature of the menu file"""
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load(self, signature) -> MenuSnapshot:
+        """Load the menu into a new snapshot, from its compiled file when fresh"""
+        if self.use_snapshot and signature is not None:
+            compiled = read_snapshot(snapshot_path(self.path), signature)
+            if compiled is not None:
+                data, prices = compiled
+                self._version += 1
+                logger.info(f"Loaded compiled menu {self.path} (version {self._version})")
+                return MenuSnapshot(data, self._version, signature, prices)
+        
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if not isinstance(data, dict):
+                raise ValueError("menu root must be an object")
+        except FileNotFoundError:
+            logger.error(f"Menu data file not found: {self.path}")
+            data = {}
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Error parsing menu data {self.path}: {e}")
+            if self._snapshot is not None:
+                # Keep serving the last good menu while the file is broken
+                return MenuSnapshot(self._snapshot.data, self._snapshot.version, signature)
+            data = {}
+
+        self._version += 1
+        logger.info(f"Loaded menu {self.path} (version {self._version})")
+        snapshot = MenuSnapshot(data, self._version, signature)
+        
+        if self.use_snapshot and signature is not None and data:
+            try:
+                write_snapshot(data, snapshot_path(self.path), signature,
+                               snapshot.categories, snapshot.prices)
+            except Exception as e:
+                # The snapshot only speeds up the next load; serve the menu regardless
+                # (e.g. strings with NUL characters can't be stored in one)
+                logger.warning(f"Could not write menu snapshot for {self.path}: {e}")
+        return snapshot
+
+    def get(self) -> MenuSnapshot:
+        """Get the current snapshot, reloading it if the file changed"""
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._checked_at < self.stat_interval:
+            return snapshot
+
+        signature = self._stat_signature()
+        self._checked_at = now
+        if snapshot is not None and signature == snapshot.signature:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            snapshot = self._snapshot
+            if snapshot is None or signature != snapshot.signature:
+                snapshot = self._load(signature)
+                self._snapshot = snapshot
+        return snapshot
+
+    def reload(self) -> MenuSnapshot:
+        """Force a reload of the menu file"""
+        with self._lock:
+            self._snapshot = self._load(self._stat_signature())
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+
+class ItemKeys:
+    """Process-wide interning of item ids to small integer keys
+
+    Keys stay stable across menu reloads, so compact structures such as
+    carts can refer to items by key instead of holding id strings.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def key(self, item_id: str) -> int:
+        """Get the key of an item id, assigning one on first use"""
+        key = self._keys.get(item_id)
+        if key is None:
+            with self._lock:
+                key = self._keys.get(item_id)
+                if key is None:
+                    key = len(self._ids)
+                    self._ids.append(item_id)
+                    self._keys[item_id] = key
+        return key
+
+    def find(self, item_id: str) -> Optional[int]:
+        """Get the key of an item id without assigning one"""
+        return self._keys.get(item_id)
+
+    def item_id(self, key: int) -> str:
+        """Get the item id of a key"""
+        return self._ids[key]
+
+
+item_keys = ItemKeys()
+
+
+_catalogs: Dict[str, MenuCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path: str) -> MenuCatalog:
+    """Get the shared catalog for a menu file"""
+    catalog = _catalogs.get(path)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(path, MenuCatalog(path))
+    return catalog
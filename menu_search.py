@@ -0,0 +1,170 @@
+"""
+Full-text menu search for the Telegram Cafe Bot
+An inverted index over item names, descriptions and categories, built once
+per menu version
+"""
+
+import heapq
+import re
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Any, Tuple
+
+# Score of a query term found in each field
+FIELD_WEIGHTS = {
+    "name": 3,
+    "category": 2,
+    "description": 1
+}
+# Extra score when a term matches a whole word rather than a prefix
+EXACT_BONUS = 1
+# Shorter terms only match whole words, so "a" doesn't expand to half the menu
+MIN_PREFIX_LENGTH = 2
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class SearchIndex:
+    """Inverted index of one menu version with prefix matching"""
+
+    def __init__(self, menu):
+        self._items: List[Dict[str, Any]] = []
+        # token -> {item position: field weight}
+        postings: Dict[str, Dict[int, int]] = {}
+
+        for item_id, item in menu.items_by_id.items():
+            position = len(self._items)
+            self._items.append(item)
+
+            category = menu.categories.get(menu.get_category_key(item_id), {})
+            fields = {
+                "name": item.get("name", ""),
+                "description": item.get("description", ""),
+                "category": f"{menu.get_category_key(item_id)} {category.get('name', '')}"
+            }
+            for field, text in fields.items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(str(text)):
+                    entry = postings.setdefault(token, {})
+                    if entry.get(position, 0) < weight:
+                        entry[position] = weight
+
+        # Sorted vocabulary so that a prefix maps to a contiguous range
+        self._vocabulary: List[str] = sorted(postings)
+        # Postings of each token, best weight first and then in menu order,
+        # so the best matches of a term can be read without scoring the rest
+        self._postings: List[Tuple[Tuple[int, int], ...]] = [
+            tuple(sorted(postings[token].items(), key=lambda entry: (-entry[1], entry[0])))
+            for token in self._vocabulary
+        ]
+        # The same postings as position -> weight, to score given candidates
+        self._weights: List[Dict[int, int]] = [postings[token] for token in self._vocabulary]
+
+    def _term_tokens(self, term: str) -> range:
+        """Get the vocabulary indexes of the words a term matches"""
+        start = bisect_left(self._vocabulary, term)
+        end = start
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(term):
+            if len(term) < MIN_PREFIX_LENGTH and self._vocabulary[end] != term:
+                break
+            end += 1
+        return range(start, end)
+
+    def _bonus(self, index: int, term: str) -> int:
+        return EXACT_BONUS if self._vocabulary[index] == term else 0
+
+    def _match_term(self, term: str, tokens: range) -> Dict[int, int]:
+        """Score every item containing a word that starts with term"""
+        scores: Dict[int, int] = {}
+        for index in tokens:
+            bonus = self._bonus(index, term)
+            for position, weight in self._postings[index]:
+                score = weight + bonus
+                if scores.get(position, 0) < score:
+                    scores[position] = score
+        return scores
+
+    def _score_candidates(self, term: str, tokens: range, candidates) -> Dict[int, int]:
+        """Score only the given items against a term"""
+        scores: Dict[int, int] = {}
+        for index in tokens:
+            bonus = self._bonus(index, term)
+            weights = self._weights[index]
+            for position in candidates:
+                weight = weights.get(position)
+                if weight is not None and scores.get(position, 0) < weight + bonus:
+                    scores[position] = weight + bonus
+        return scores
+
+    def _ranked(self, index: int, term: str) -> Iterator[Tuple[int, int]]:
+        """Yield (-score, position) of a word's items, best first"""
+        bonus = self._bonus(index, term)
+        for position, weight in self._postings[index]:
+            yield -(weight + bonus), position
+
+    def _best_matches(self, term: str, tokens: range, limit: int) -> List[int]:
+        """Get the best ``limit`` items of a single-term query
+
+        Merges the weight-sorted postings of the matching words and stops
+        after ``limit`` distinct items, so a term shared by thousands of
+        items (e.g. a category name) costs about as much as a rare one.
+        """
+        if len(tokens) == 1:
+            # One word: its postings already are the ranking
+            return [position for position, _ in self._postings[tokens[0]][:limit]]
+
+        streams = [self._ranked(index, term) for index in tokens]
+        positions: List[int] = []
+        seen = set()
+        # An item comes first with its best score, so later repeats are skipped
+        for _, position in heapq.merge(*streams):
+            if position not in seen:
+                seen.add(position)
+                positions.append(position)
+                if len(positions) == limit:
+                    break
+        return positions
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Find items matching every term of the query, best matches first"""
+        terms = tokenize(query)
+        if not terms or limit <= 0:
+            return []
+
+        matches = [(term, self._term_tokens(term)) for term in terms]
+        if len(matches) == 1:
+            term, tokens = matches[0]
+            if not tokens:
+                return []
+            return [self._items[position] for position in self._best_matches(term, tokens, limit)]
+
+        # Start from the term with the fewest postings to keep candidates
+        # small, then score only those candidates against the other terms
+        sizes = {term: sum(len(self._postings[index]) for index in tokens) for term, tokens in matches}
+        matches.sort(key=lambda match: sizes[match[0]])
+        term, tokens = matches[0]
+        totals = self._match_term(term, tokens)
+        for term, tokens in matches[1:]:
+            if not totals:
+                break
+            if len(totals) * len(tokens) < sizes[term]:
+                scores = self._score_candidates(term, tokens, totals)
+            else:
+                scores = self._match_term(term, tokens)
+            totals = {
+                position: total + scores[position]
+                for position, total in totals.items()
+                if position in scores
+            }
+
+        ranked = heapq.nsmallest(limit, totals.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [self._items[position] for position, _ in ranked]
+
+
+def get_search_index(menu) -> SearchIndex:
+    """Get the search index of a menu snapshot, building it on first use"""
+    return menu.cached("search_index", lambda: SearchIndex(menu))
@@ -0,0 +1,50 @@
+"""
+Blocking work off the event loop for the Enhanced Telegram Cafe Bot
+Storage backends that block on disk or network run on worker threads, so
+a slow call only delays the user who made it
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BoundedExecutor:
+    """Runs blocking calls on a dedicated pool of ``workers`` threads
+
+    At most ``queue_size`` calls are in flight; further callers wait for a
+    slot instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_size: int, name: str):
+        self.name = name
+        # Threads are started on demand, so idle pools cost nothing
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(queue_size)
+        self.waiting = 0
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """Run ``function(*args)`` on a worker thread and await its result"""
+        if self._slots.locked():
+            self.waiting += 1
+            if self.waiting == 1:
+                logger.warning(f"{self.name} queue full, callers are waiting for a slot")
+            try:
+                await self._slots.acquire()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._slots.acquire()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Finish the calls in flight and stop the threads"""
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,118 @@
+"""
+Order IDs for the Enhanced Telegram Cafe Bot
+Short, time-sortable IDs that are unique without looking at past orders
+
+An ID packs 60 bits, snowflake style:
+
+    42 bits  milliseconds since ORDER_ID_EPOCH (enough for ~139 years)
+     8 bits  node: ORDER_ID_NODE, plus shard index + 1 in a shard worker
+    10 bits  sequence within the millisecond
+
+and spells them as 12 Crockford base32 characters, e.g. ``0C4N9T2R7XQ1``.
+The alphabet has no I, L, O or U, so IDs read out over the phone are hard
+to mistype. Fixed-width IDs sort like their creation times, so a range of
+IDs is a range of time.
+
+IDs are unique only between processes with different nodes: every bot
+process sharing an orders store needs its own ORDER_ID_NODE (a sharded one
+takes ORDER_ID_NODE to ORDER_ID_NODE + SHARD_COUNT). On startup backends
+pass their newest stored ID to ``observe``, so a process restarted after
+the clock stepped back doesn't reissue IDs. As a last resort they retry a
+duplicate ID instead of overwriting an order.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from enhanced_config import ORDER_ID_NODE
+from sharding import shard_index
+
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+ORDER_ID_LENGTH = 12
+ORDER_ID_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_NODE_BITS = 8
+_SEQUENCE_BITS = 10
+_EPOCH_MS = int(ORDER_ID_EPOCH.timestamp() * 1000)
+
+
+def encode(value: int) -> str:
+    """Spell a 60-bit value as a fixed-width base32 ID"""
+    chars = []
+    for _ in range(ORDER_ID_LENGTH):
+        value, digit = divmod(value, 32)
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def decode(order_id: str) -> Optional[int]:
+    """Get the 60-bit value of an ID, None for old random IDs"""
+    if len(order_id) != ORDER_ID_LENGTH:
+        return None
+    value = 0
+    for char in order_id.upper():
+        position = ALPHABET.find(char)
+        if position < 0:
+            return None
+        value = value * 32 + position
+    return value
+
+
+class OrderIdGenerator:
+    """Generates increasing order IDs for one process
+
+    Unique across processes as long as each uses its own node number.
+    Up to 1024 IDs are issued per millisecond; past that, and if the clock
+    steps back, the sequence borrows from the next millisecond, so within
+    one process lifetime IDs never repeat or go backwards. Across restarts
+    that holds once ``observe`` was given the newest stored ID.
+    """
+
+    def __init__(self, node: int):
+        if not 0 <= node < 1 << _NODE_BITS:
+            raise ValueError(f"Order ID node must be below {1 << _NODE_BITS}: {node}")
+        self.node = node
+        self._lock = threading.Lock()
+        self._last = 0  # (milliseconds << _SEQUENCE_BITS) | sequence of the last ID
+
+    def __call__(self) -> str:
+        now = (int(time.time() * 1000) - _EPOCH_MS) << _SEQUENCE_BITS
+        with self._lock:
+            self._last = max(now, self._last + 1)
+            last = self._last
+        millis, sequence = divmod(last, 1 << _SEQUENCE_BITS)
+        return encode((millis << _NODE_BITS | self.node) << _SEQUENCE_BITS | sequence)
+
+    def observe(self, order_id: str) -> None:
+        """Continue after an existing ID, so no later ID sorts before it"""
+        value = decode(order_id)
+        if value is None:
+            return
+        millis = value >> (_NODE_BITS + _SEQUENCE_BITS)
+        sequence = value & ((1 << _SEQUENCE_BITS) - 1)
+        with self._lock:
+            self._last = max(self._last, millis << _SEQUENCE_BITS | sequence)
+
+
+def order_id_time(order_id: str) -> Optional[datetime]:
+    """Get the creation time encoded in an order ID, None for old random IDs"""
+    value = decode(order_id)
+    if value is None:
+        return None
+    millis = value >> (_NODE_BITS + _SEQUENCE_BITS)
+    return datetime.fromtimestamp((millis + _EPOCH_MS) / 1000, timezone.utc)
+
+
+def first_order_id(at: datetime) -> str:
+    """Get the lowest ID an order created at ``at`` or later can have
+
+    ``first_order_id(start) <= order_id < first_order_id(end)`` selects the
+    orders created in [start, end).
+    """
+    millis = max(0, int(at.timestamp() * 1000) - _EPOCH_MS)
+    return encode(millis << (_NODE_BITS + _SEQUENCE_BITS))
+
+
+new_order_id = OrderIdGenerator(ORDER_ID_NODE + (0 if shard_index is None else shard_index + 1))
@@ -0,0 +1,50 @@
+"""
+Cart pricing for the Enhanced Telegram Cafe Bot
+Prices one or many carts, or the item dicts of orders, against the menu
+catalog in one call
+"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+class PricedLine(NamedTuple):
+    """One priced cart line; ``item`` is None if it left the menu"""
+    item_id: str
+    item: Optional[Dict[str, Any]]
+    quantity: int
+    unit_price: int
+    amount: int
+
+
+class PricedCart(NamedTuple):
+    """The priced lines of a cart and their total, in integer cents"""
+    lines: List[PricedLine]
+    total: int
+
+
+def price_carts(menu, carts: Iterable[Any]) -> List[PricedCart]:
+    """Price many carts in a single pass over their lines
+
+    ``menu`` is a ``MenuSnapshot``; ``carts`` holds Cart objects or
+    {item_id: quantity} dicts such as the items of an order. Each line is
+    resolved with one lookup in the catalog's id index; items that are no
+    longer on the menu are priced at 0.
+    """
+    items_by_id = menu.items_by_id
+    prices = menu.prices
+    priced = []
+    for cart in carts:
+        lines = []
+        total = 0
+        for item_id, quantity in cart.items():
+            unit_price = prices.get(item_id, 0)
+            amount = unit_price * quantity
+            lines.append(PricedLine(item_id, items_by_id.get(item_id), quantity, unit_price, amount))
+            total += amount
+        priced.append(PricedCart(lines, total))
+    return priced
+
+
+def price_cart(menu, cart: Any) -> PricedCart:
+    """Price a single cart"""
+    return price_carts(menu, (cart,))[0]
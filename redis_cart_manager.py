@@ -0,0 +1,150 @@
+"""
+Shared shopping carts for the Enhanced Telegram Cafe Bot
+Keeps carts in a Redis-protocol server so several bot processes serve the
+same carts
+"""
+
+import logging
+from enhanced_cart_manager import BaseCartManager, Cart
+from enhanced_config import MAX_CART_ITEMS, ORDER_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+class RedisCartManager(BaseCartManager):
+    """Manages user shopping carts in a Redis-protocol server
+
+    Each cart is a hash ``{prefix}{user_id}`` of item id -> quantity that
+    expires ``ttl`` seconds after its last change. Every operation costs
+    one round-trip: the read-modify-write of add_item and update_quantity
+    (cart limit check, write and expiry) is sent as one MULTI/EXEC
+    pipeline. A second one only follows when the limit is hit or a
+    negative add_item empties the line, to remove it again.
+    """
+
+    # Every call waits on the network
+    blocking = True
+
+    def __init__(self, client, ttl=ORDER_TIMEOUT, prefix="cart:"):
+        # ``client`` is a resp_client.RedisClient, whose pool is shared
+        self.client = client
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def _key(self, user_id):
+        return f"{self.prefix}{user_id}"
+
+    def get_cart(self, user_id):
+        """Get user's cart
+
+        The cart is a copy of the stored one; use the CartManager methods
+        to change carts.
+        """
+        return self._to_cart(self.client.execute("HGETALL", self._key(user_id)))
+
+    def get_carts(self, user_ids):
+        """Get the carts of many users in one round-trip"""
+        replies = self.client.pipeline([("HGETALL", self._key(user_id)) for user_id in user_ids])
+        return [self._to_cart(fields) for fields in replies]
+
+    @staticmethod
+    def _to_cart(fields):
+        if isinstance(fields, Exception):
+            raise fields
+        cart = Cart()
+        for item_id, quantity in zip(fields[::2], fields[1::2]):
+            cart.set(item_id.decode("utf-8"), int(quantity))
+        return cart
+
+    def _write_line(self, user_id, item_id, command, quantity):
+        """Run HINCRBY or HSET on a line, enforcing MAX_CART_ITEMS"""
+        key = self._key(user_id)
+        length, existed, written, _ = self.client.transaction([
+            ("HLEN", key),
+            ("HEXISTS", key, item_id),
+            (command, key, item_id, quantity),
+            ("EXPIRE", key, self.ttl)
+        ])
+
+        # The line was new and the cart was already full: undo it
+        if not existed and length >= MAX_CART_ITEMS and quantity > 0:
+            self.client.execute("HDEL", key, item_id)
+            logger.warning(f"Cart limit exceeded for user {user_id}")
+            return False
+        # HINCRBY returns the new quantity; a decrement that emptied the
+        # line, or hit a missing one, leaves no line behind
+        if command == "HINCRBY" and written <= 0:
+            self.client.execute("HDEL", key, item_id)
+            return bool(existed)
+        return True
+
+    def add_item(self, user_id, item_id, quantity=1):
+        """Add item to user's cart; a negative quantity takes it away"""
+        try:
+            if not self._write_line(user_id, item_id, "HINCRBY", quantity):
+                return False
+
+            logger.info(f"Added item {item_id} (qty: {quantity}) to cart for user {user_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error adding item to cart for user {user_id}: {e}")
+            return False
+
+    def remove_item(self, user_id, item_id):
+        """Remove item from user's cart"""
+        try:
+            key = self._key(user_id)
+            removed, _ = self.client.transaction([
+                ("HDEL", key, item_id),
+                ("EXPIRE", key, self.ttl)
+            ])
+
+            if removed:
+                logger.info(f"Removed item {item_id} from cart for user {user_id}")
+                return True
+
+            return False
+
+        except Exception as e:
+            logger.error(f"Error removing item from cart for user {user_id}: {e}")
+            return False
+
+    def update_quantity(self, user_id, item_id, quantity):
+        """Update item quantity in cart"""
+        try:
+            if quantity <= 0:
+                return self.remove_item(user_id, item_id)
+
+            if not self._write_line(user_id, item_id, "HSET", quantity):
+                return False
+
+            logger.info(f"Updated item {item_id} quantity to {quantity} for user {user_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating quantity for user {user_id}: {e}")
+            return False
+
+    def get_item_quantity(self, user_id, item_id):
+        """Get quantity of specific item in cart"""
+        try:
+            quantity = self.client.execute("HGET", self._key(user_id), item_id)
+            return int(quantity) if quantity is not None else 0
+        except Exception as e:
+            logger.error(f"Error getting item quantity for user {user_id}: {e}")
+            return 0
+
+    def clear_cart(self, user_id):
+        """Clear user's cart"""
+        try:
+            if self.client.execute("DEL", self._key(user_id)):
+                logger.info(f"Cleared cart for user {user_id}")
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Error clearing cart for user {user_id}: {e}")
+            return False
+
+    def close(self):
+        """Close the idle pooled connections"""
+        self.client.pool.close()
@@ -0,0 +1,170 @@
+"""
+Minimal Redis protocol (RESP2) client for the Enhanced Telegram Cafe Bot
+Speaks just enough of the protocol for the shared cart backend, with pooled
+connections and pipelining, so no third-party client is required
+"""
+
+import socket
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+from urllib.parse import urlparse
+
+DEFAULT_PORT = 6379
+
+
+class RedisError(Exception):
+    """Error reply from the server"""
+
+
+def encode_command(*args: Any) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode("utf-8")
+        else:
+            data = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def read_reply(reader) -> Any:
+    """Read one reply from a buffered binary stream
+
+    Error replies are returned as ``RedisError`` instances rather than
+    raised, so every reply of a pipeline is consumed.
+    """
+    line = reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        return RedisError(payload.decode("utf-8"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return reader.read(length + 2)[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [read_reply(reader) for _ in range(length)]
+    raise RedisError(f"unknown reply type {kind!r}")
+
+
+def _raise_errors(replies: List[Any]) -> List[Any]:
+    for reply in replies:
+        if isinstance(reply, RedisError):
+            raise reply
+    return replies
+
+
+class Connection:
+    """One socket to the server"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self._socket = socket.create_connection((host, port), timeout)
+        # Pipelines are written in one call; don't delay the small packets
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._socket.makefile("rb")
+
+    def execute_many(self, commands: Sequence[Tuple]) -> List[Any]:
+        """Send commands in one write and read their replies"""
+        self._socket.sendall(b"".join(encode_command(*command) for command in commands))
+        return [read_reply(self._reader) for _ in commands]
+
+    def close(self) -> None:
+        self._reader.close()
+        self._socket.close()
+
+
+class ConnectionPool:
+    """Reuses up to ``max_connections`` connections to one server
+
+    ``url`` is ``redis://host:port/db``. Callers beyond the limit wait for
+    a connection to be returned.
+    """
+
+    def __init__(self, url: str, max_connections: int = 10, timeout: float = 5.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or DEFAULT_PORT
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Connection:
+        connection = Connection(self.host, self.port, self.timeout)
+        if self.db:
+            _raise_errors(connection.execute_many([("SELECT", self.db)]))
+        return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a connection; it is dropped instead of reused after an error"""
+        with self._slots:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                connection = self._connect()
+            try:
+                yield connection
+            except BaseException:
+                connection.close()
+                raise
+            with self._lock:
+                self._idle.append(connection)
+
+    def close(self) -> None:
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+
+class RedisClient:
+    """Runs commands, pipelines and transactions over a connection pool"""
+
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+
+    def pipeline(self, commands: Sequence[Tuple]) -> List[Any]:
+        """Run commands in one round-trip; error replies are returned, not raised"""
+        with self.pool.connection() as connection:
+            return connection.execute_many(commands)
+
+    def execute(self, *args: Any) -> Any:
+        """Run one command"""
+        return _raise_errors(self.pipeline([args]))[0]
+
+    def transaction(self, commands: Sequence[Tuple]) -> List[Any]:
+        """Run commands atomically in MULTI/EXEC, in one round-trip"""
+        replies = _raise_errors(self.pipeline([("MULTI",), *commands, ("EXEC",)]))
+        results = replies[-1]
+        if results is None:
+            raise RedisError("transaction aborted")
+        return _raise_errors(results)
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_client(url: str, max_connections: int = 10) -> RedisClient:
+    """Get a client whose pool is shared by every caller of the same URL"""
+    with _pools_lock:
+        pool = _pools.get(url)
+        if pool is None:
+            pool = _pools[url] = ConnectionPool(url, max_connections)
+    return RedisClient(pool)
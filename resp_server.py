@@ -0,0 +1,217 @@
+"""
+In-process stand-in for a Redis server
+Implements the commands used by the shared cart backend over the real
+protocol, so the backend can be exercised locally without a Redis install
+
+Usage:
+    with LocalRedisServer() as server:
+        client = get_client(server.url)
+"""
+
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from resp_client import RedisError, read_reply
+
+
+def encode_reply(value: Any) -> bytes:
+    """Encode a reply value in RESP"""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-%s\r\n" % str(value).encode("utf-8")
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode("utf-8")
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode_reply(item) for item in value)
+    raise TypeError(f"cannot encode {type(value).__name__}")
+
+
+class _Store:
+    """The keyspace: hashes with optional expiry"""
+
+    def __init__(self):
+        self.hashes: Dict[bytes, Dict[bytes, bytes]] = {}
+        self.deadlines: Dict[bytes, float] = {}
+        self.lock = threading.Lock()
+
+    def _hash(self, key: bytes, create: bool = False) -> Optional[Dict[bytes, bytes]]:
+        deadline = self.deadlines.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._delete(key)
+        value = self.hashes.get(key)
+        if value is None and create:
+            value = self.hashes[key] = {}
+        return value
+
+    def _delete(self, key: bytes) -> int:
+        self.deadlines.pop(key, None)
+        return 1 if self.hashes.pop(key, None) is not None else 0
+
+    def _cleanup(self, key: bytes) -> None:
+        # Like Redis, a hash whose last field is removed stops existing
+        if not self.hashes.get(key, True):
+            self._delete(key)
+
+    def ping(self, *args: bytes) -> Any:
+        return args[0] if args else "PONG"
+
+    def select(self, db: bytes) -> Any:
+        return "OK"
+
+    def flushall(self) -> Any:
+        self.hashes.clear()
+        self.deadlines.clear()
+        return "OK"
+
+    def delete(self, *keys: bytes) -> Any:
+        return sum(self._delete(key) for key in keys if self._hash(key) is not None)
+
+    def expire(self, key: bytes, seconds: bytes) -> Any:
+        if self._hash(key) is None:
+            return 0
+        self.deadlines[key] = time.monotonic() + int(seconds)
+        return 1
+
+    def ttl(self, key: bytes) -> Any:
+        if self._hash(key) is None:
+            return -2
+        deadline = self.deadlines.get(key)
+        return -1 if deadline is None else max(0, round(deadline - time.monotonic()))
+
+    def hgetall(self, key: bytes) -> Any:
+        return [part for field, value in (self._hash(key) or {}).items() for part in (field, value)]
+
+    def hget(self, key: bytes, field: bytes) -> Any:
+        return (self._hash(key) or {}).get(field)
+
+    def hlen(self, key: bytes) -> Any:
+        return len(self._hash(key) or {})
+
+    def hexists(self, key: bytes, field: bytes) -> Any:
+        return field in (self._hash(key) or {})
+
+    def hset(self, key: bytes, *pairs: bytes) -> Any:
+        if not pairs or len(pairs) % 2:
+            return RedisError("ERR wrong number of arguments for 'hset' command")
+        values = self._hash(key, create=True)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in values
+            values[field] = value
+        return added
+
+    def hincrby(self, key: bytes, field: bytes, increment: bytes) -> Any:
+        values = self._hash(key, create=True)
+        try:
+            total = int(values.get(field, b"0")) + int(increment)
+        except ValueError:
+            self._cleanup(key)
+            return RedisError("ERR hash value is not an integer")
+        values[field] = str(total).encode("ascii")
+        return total
+
+    def hdel(self, key: bytes, *fields: bytes) -> Any:
+        values = self._hash(key)
+        if values is None:
+            return 0
+        removed = sum(values.pop(field, None) is not None for field in fields)
+        self._cleanup(key)
+        return removed
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Serves one client connection, including its MULTI/EXEC state"""
+
+    def setup(self) -> None:
+        super().setup()
+        # Replies are written one by one; don't hold them back for ACKs
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self) -> None:
+        store: _Store = self.server.store
+        queued: Optional[List[List[bytes]]] = None
+        while True:
+            try:
+                command = read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(command, list) or not command:
+                self.wfile.write(encode_reply(RedisError("ERR protocol error")))
+                continue
+
+            name = command[0].decode("ascii", "replace").upper()
+            if name == "MULTI":
+                queued = []
+                reply = "OK"
+            elif name == "EXEC":
+                if queued is None:
+                    reply = RedisError("ERR EXEC without MULTI")
+                else:
+                    with store.lock:
+                        reply = [self._run(store, queued_command) for queued_command in queued]
+                    queued = None
+            elif name == "DISCARD":
+                queued = None
+                reply = "OK"
+            elif queued is not None:
+                queued.append(command)
+                reply = "QUEUED"
+            else:
+                with store.lock:
+                    reply = self._run(store, command)
+            self.wfile.write(encode_reply(reply))
+
+    @staticmethod
+    def _run(store: _Store, command: List[bytes]) -> Any:
+        name = command[0].decode("ascii", "replace").lower()
+        method: Optional[Callable] = getattr(store, "delete" if name == "del" else name, None)
+        if method is None or name.startswith("_"):
+            return RedisError(f"ERR unknown command '{name}'")
+        try:
+            return method(*command[1:])
+        except TypeError:
+            return RedisError(f"ERR wrong number of arguments for '{name}' command")
+        except ValueError:
+            return RedisError("ERR value is not an integer or out of range")
+
+
+class LocalRedisServer(socketserver.ThreadingTCPServer):
+    """Stand-in Redis server on a free local port, served from a thread"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _Handler)
+        self.store = _Store()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "LocalRedisServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="local-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "LocalRedisServer":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
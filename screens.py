@@ -0,0 +1,59 @@
+"""
+Precomputed static screens for the Telegram Cafe Bot
+Screens whose text and keyboard come only from the config are built once
+and sent as-is by the handlers
+"""
+
+import importlib
+import logging
+import threading
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+from telegram import InlineKeyboardMarkup
+
+logger = logging.getLogger(__name__)
+
+
+class Screen:
+    """A ready-to-send message: text, parse mode and keyboard"""
+
+    __slots__ = ('text', 'parse_mode', 'reply_markup')
+
+    def __init__(self, text: str, parse_mode: Optional[str] = None,
+                 reply_markup: Optional[InlineKeyboardMarkup] = None):
+        self.text = text
+        self.parse_mode = parse_mode
+        self.reply_markup = reply_markup
+
+
+class ScreenRegistry:
+    """Builds every static screen from a config and keeps them ready
+
+    ``config`` is a config module, or any object exposing the same
+    attributes (such as a tenant's config).
+    """
+
+    def __init__(self, config: Any, build: Callable[[Any], Dict[str, Screen]]):
+        self.config = config
+        self._build = build
+        self._lock = threading.Lock()
+        self._screens = build(config)
+
+    def __getitem__(self, name: str) -> Screen:
+        return self._screens[name]
+
+    def reload(self) -> None:
+        """Reload the config module and rebuild every screen"""
+        with self._lock:
+            try:
+                config = self.config
+                if isinstance(config, ModuleType):
+                    config = importlib.reload(config)
+                screens = self._build(config)
+            except Exception as e:
+                logger.error(f"Error reloading screens: {e}")
+                return
+            self.config = config
+            self._screens = screens
+            logger.info(f"Rebuilt {len(screens)} screens")
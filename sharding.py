@@ -0,0 +1,203 @@
+"""
+Sharded multi-process mode for the Enhanced Telegram Cafe Bot
+With SHARD_COUNT > 1 the main process only polls Telegram and routes every
+update, by consistent hashing on its user id, to one of SHARD_COUNT worker
+processes. Each worker runs the handlers and owns the carts and
+conversation state of its users in memory, so no locks or external store
+are shared between processes. Order storage is partitioned too: each
+worker writes its own order log (see shard_file), and the router holds no
+carts or orders at all
+
+Orders are not moved between logs. Switching from one process to shards
+leaves the orders in orders.jsonl (or the legacy orders.json) unread, and
+lowering SHARD_COUNT does the same to the logs of the removed shards, so
+every process refuses to start while order logs of another layout exist
+(see check_shard_layout). Merge them into the logs of the new layout, or
+go back to the old SHARD_COUNT. Raising SHARD_COUNT keeps every log in
+use, but users moved to a new shard leave their past orders behind in
+their old shard's log.
+"""
+
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+from typing import Any, Callable, Hashable, List, Optional
+
+from telegram import Chat, Update
+
+from enhanced_config import SHARD_COUNT
+
+logger = logging.getLogger(__name__)
+
+# Set by the router in each worker's environment before it starts
+SHARD_INDEX_ENV = "SHARD_INDEX"
+RING_REPLICAS = 100  # points per shard on the hash ring
+
+
+def _hash(key: str) -> int:
+    # Stable across processes, unlike hash() of a str
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to shard indexes
+
+    Each shard owns RING_REPLICAS points on the ring, so changing the
+    number of shards only moves the keys of the added or removed shards.
+    """
+
+    def __init__(self, shards: int, replicas: int = RING_REPLICAS):
+        points = sorted(
+            (_hash(f"shard-{shard}-{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self.shards = shards
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    def shard_for(self, key: Hashable) -> int:
+        """Get the shard owning a key"""
+        position = bisect.bisect(self._hashes, _hash(str(key)))
+        return self._owners[position % len(self._owners)]
+
+
+ring = HashRing(max(SHARD_COUNT, 1))
+_worker_index = os.getenv(SHARD_INDEX_ENV)
+shard_index: Optional[int] = int(_worker_index) if _worker_index is not None else None
+
+
+def owns_user(user_id: Hashable) -> bool:
+    """Check whether this process holds the state of a user
+
+    Always true without sharding; in sharded mode only the worker of the
+    user's shard does, and the router process holds no state at all.
+    """
+    if SHARD_COUNT <= 1:
+        return True
+    return shard_index is not None and ring.shard_for(user_id) == shard_index
+
+
+def holds_state() -> bool:
+    """Check whether this process handles updates and so holds carts and orders
+
+    False only in the router process of sharded mode, which just forwards
+    updates to the workers.
+    """
+    return SHARD_COUNT <= 1 or shard_index is not None
+
+
+def shard_file(path: str) -> str:
+    """Get the copy of a data file that only this process writes
+
+    Shard workers add their index (orders.shard2.jsonl); other processes
+    use the path as is.
+    """
+    if shard_index is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.shard{shard_index}{extension}"
+
+
+class ShardLayoutError(RuntimeError):
+    """Raised when data files of another SHARD_COUNT would be left unread"""
+
+
+def check_shard_layout(path: str) -> None:
+    """Refuse to run while order logs of another shard layout exist
+
+    ``path`` is the unsharded log path. With sharding that log, its legacy
+    .json file and the logs of shards at or past SHARD_COUNT are foreign;
+    without it, every shard log is. Empty files are ignored.
+    """
+    directory, name = os.path.split(path)
+    root, extension = os.path.splitext(name)
+    shard_pattern = re.compile(rf"{re.escape(root)}\.shard(\d+){re.escape(extension)}")
+    candidates = []
+    if SHARD_COUNT > 1:
+        candidates += [name, root + ".json"]
+    for entry in os.listdir(directory or "."):
+        match = shard_pattern.fullmatch(entry)
+        if match and (SHARD_COUNT <= 1 or int(match.group(1)) >= SHARD_COUNT):
+            candidates.append(entry)
+
+    foreign = []
+    for candidate in candidates:
+        candidate_path = os.path.join(directory, candidate)
+        if os.path.isfile(candidate_path) and os.path.getsize(candidate_path) > 0:
+            foreign.append(candidate_path)
+    if foreign:
+        raise ShardLayoutError(
+            f"Found order logs of another shard layout (SHARD_COUNT is {SHARD_COUNT}): "
+            f"{', '.join(sorted(foreign))}; merge them into the current logs or restore SHARD_COUNT"
+        )
+
+
+def routing_key(update: Update) -> Optional[Hashable]:
+    """Get the key an update is routed by: its user, else its chat
+
+    Group chats are routed by chat, so the shared cart of a table lives in
+    one worker.
+    """
+    chat = update.effective_chat
+    if chat is not None and chat.type in (Chat.GROUP, Chat.SUPERGROUP):
+        return chat.id
+    if update.effective_user is not None:
+        return update.effective_user.id
+    if update.effective_chat is not None:
+        return update.effective_chat.id
+    return None
+
+
+class ShardRouter:
+    """Starts the SHARD_COUNT worker processes and hands them their updates
+
+    ``worker`` is called in each worker process with the queue it receives
+    ``(bot_token, update_dict)`` messages from; None asks it to stop.
+    """
+
+    def __init__(self, worker: Callable[[Any], None]):
+        self.worker = worker
+        self.ring = ring
+        self._context = multiprocessing.get_context("spawn")
+        self._queues: List[Any] = []
+        self._processes: List[Any] = []
+
+    def start(self) -> None:
+        """Spawn one worker process per shard"""
+        for index in range(self.ring.shards):
+            queue = self._context.Queue()
+            process = self._context.Process(
+                target=self.worker, args=(queue,), name=f"shard-{index}", daemon=True
+            )
+            # Spawned children read their shard while importing the bot modules
+            os.environ[SHARD_INDEX_ENV] = str(index)
+            try:
+                process.start()
+            finally:
+                del os.environ[SHARD_INDEX_ENV]
+            self._queues.append(queue)
+            self._processes.append(process)
+        logger.info(f"Started {len(self._processes)} shard workers")
+
+    def route(self, token: str, update: Update) -> int:
+        """Send an update to the worker of its shard"""
+        key = routing_key(update)
+        shard = self.ring.shard_for(key) if key is not None else 0
+        self._queues[shard].put((token, update.to_dict()))
+        return shard
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Ask every worker to finish its queue and exit"""
+        for queue in self._queues:
+            queue.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"Shard worker {process.name} did not stop, terminating it")
+                process.terminate()
+        self._queues.clear()
+        self._processes.clear()
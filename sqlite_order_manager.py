@@ -0,0 +1,179 @@
+"""
+SQLite order storage for the Telegram Cafe Bot
+Keeps orders in a SQLite database in WAL mode, indexed for lookups by
+customer, status and time. Several cafes (tenants) can share a database:
+every row and index is keyed by the cafe's namespace first.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from enhanced_config import ORDERS_DB_FILE, ORDER_STATUS
+from enhanced_order_manager import ORDER_ID_ATTEMPTS, build_order
+from order_ids import new_order_id
+
+logger = logging.getLogger(__name__)
+
+_TABLE = """
+CREATE TABLE IF NOT EXISTS orders (
+    id TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    user_id INTEGER,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL
+)
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS orders_namespace_user_id ON orders (namespace, user_id, created_at);
+CREATE INDEX IF NOT EXISTS orders_namespace_status ON orders (namespace, status, created_at);
+CREATE INDEX IF NOT EXISTS orders_namespace_created_at ON orders (namespace, created_at);
+"""
+
+# Statements are kept as constants so sqlite3's per-connection statement
+# cache prepares each of them once
+_INSERT = "INSERT INTO orders (id, namespace, user_id, status, created_at, updated_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)"
+_SELECT = "SELECT data FROM orders WHERE id = ? AND namespace = ?"
+_UPDATE = "UPDATE orders SET status = ?, updated_at = ?, data = ? WHERE id = ? AND namespace = ?"
+_BY_USER = "SELECT data FROM orders WHERE namespace = ? AND user_id = ? ORDER BY created_at DESC LIMIT ?"
+_BY_STATUS = "SELECT data FROM orders WHERE namespace = ? AND status = ? ORDER BY created_at LIMIT ?"
+# IDs sort by creation time; the primary key index answers this without a scan.
+# Every namespace shares the ID generator, so the newest ID of any of them counts
+_NEWEST = "SELECT MAX(id) FROM orders"
+_BETWEEN = "SELECT data FROM orders WHERE namespace = ? AND created_at >= ? AND created_at < ? ORDER BY created_at LIMIT ?"
+
+class SQLiteOrderManager:
+    """Manages customer orders in SQLite
+
+    Same interface as OrderManager, plus queries by customer, status and
+    time. Every thread gets its own connection; all lookups go through
+    the primary key or an index, so their cost doesn't grow with history.
+    Only the orders of ``namespace`` are seen and changed.
+    """
+
+    def __init__(self, db_file=ORDERS_DB_FILE, namespace="default"):
+        self.db_file = db_file
+        self.namespace = namespace
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._create_schema()
+
+    def _create_schema(self):
+        connection = self._connection()
+        connection.executescript(_TABLE + ";" + _INDEXES)
+
+        # New IDs continue after the newest stored one, even if the clock went back
+        newest, = connection.execute(_NEWEST).fetchone()
+        if newest:
+            new_order_id.observe(newest)
+
+    def _connection(self):
+        """Get the connection of the calling thread, opening it on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # Only used by this thread; close() may run on another one
+            connection = sqlite3.connect(self.db_file, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # A confirmed order must survive a power loss; in WAL mode only
+            # FULL syncs the log on every commit (NORMAL defers it to checkpoints)
+            connection.execute("PRAGMA synchronous=FULL")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def create_order(self, order_data):
+        """Create a new order"""
+        try:
+            connection = self._connection()
+            for _ in range(ORDER_ID_ATTEMPTS):
+                order = build_order(new_order_id(), order_data)
+                try:
+                    with connection:
+                        connection.execute(_INSERT, (
+                            order['id'], self.namespace, order['user_id'], order['status'],
+                            order['created_at'], order['updated_at'],
+                            json.dumps(order, ensure_ascii=False)
+                        ))
+                    break
+                except sqlite3.IntegrityError:
+                    # Another process uses the same ORDER_ID_NODE; the primary key caught it
+                    logger.warning(f"Order ID {order['id']} is taken, check ORDER_ID_NODE")
+            else:
+                raise RuntimeError("no free order ID")
+
+            logger.info(f"Created order {order['id']} for user {order_data.get('user_id')}")
+            return order['id']
+
+        except Exception as e:
+            logger.error(f"Error creating order: {e}")
+            return None
+
+    def get_order(self, order_id):
+        """Get order by ID"""
+        try:
+            row = self._connection().execute(_SELECT, (order_id, self.namespace)).fetchone()
+            return json.loads(row[0]) if row else None
+        except Exception as e:
+            logger.error(f"Error getting order {order_id}: {e}")
+            return None
+
+    def update_order_status(self, order_id, status):
+        """Update order status"""
+        try:
+            if status not in ORDER_STATUS.values():
+                logger.error(f"Invalid order status: {status}")
+                return False
+
+            connection = self._connection()
+            with connection:
+                row = connection.execute(_SELECT, (order_id, self.namespace)).fetchone()
+                if not row:
+                    return False
+
+                order = json.loads(row[0])
+                order['status'] = status
+                order['updated_at'] = datetime.now().isoformat()
+                connection.execute(_UPDATE, (
+                    status, order['updated_at'], json.dumps(order, ensure_ascii=False),
+                    order_id, self.namespace
+                ))
+
+            logger.info(f"Updated order {order_id} status to {status}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating order status: {e}")
+            return False
+
+    def _query(self, statement, parameters):
+        try:
+            rows = self._connection().execute(statement, parameters).fetchall()
+            return [json.loads(data) for data, in rows]
+        except Exception as e:
+            logger.error(f"Error querying orders: {e}")
+            return []
+
+    def get_user_orders(self, user_id, limit=20):
+        """Get a customer's most recent orders, newest first"""
+        return self._query(_BY_USER, (self.namespace, user_id, limit))
+
+    def get_orders_by_status(self, status, limit=100):
+        """Get the oldest orders with a status, e.g. the pending queue"""
+        return self._query(_BY_STATUS, (self.namespace, status, limit))
+
+    def get_orders_between(self, start, end, limit=1000):
+        """Get orders created in [start, end), given as datetimes"""
+        return self._query(_BETWEEN, (self.namespace, start.isoformat(), end.isoformat(), limit))
+
+    def close(self):
+        """Close the connections of every thread"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
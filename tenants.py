@@ -0,0 +1,246 @@
+"""
+Multi-tenant support for the Enhanced Telegram Cafe Bot
+Lets one process serve several cafes, each with its own bot token, menu,
+config, carts and orders
+
+Tenants are listed in TENANTS_FILE, keyed by a short name:
+
+    {
+      "downtown": {
+        "bot_token": "123:ABC",
+        "config": {
+          "CAFE_NAME": "☕ Artisan Downtown",
+          "MENU_FILE": "menus/downtown.json",
+          "ORDERS_FILE": "orders_downtown.jsonl",
+          "ADMIN_CHAT_ID": "-100123"
+        }
+      }
+    }
+
+The key "default" is reserved: without a tenants file the process serves
+a single cafe of that name, configured by enhanced_config alone.
+
+Config keys that a tenant does not override fall back to enhanced_config,
+except for the order log: a tenant without its own ORDERS_FILE gets the
+default name with its key added (orders.downtown.jsonl), and each shard
+worker adds its index (orders.downtown.shard1.jsonl), since every log must
+have exactly one writer. The bot refuses to start while logs of another
+shard layout exist (see sharding.py).
+Menus and screens are loaded on first use and kept in an LRU of
+TENANT_CACHE_SIZE tenants, so idle cafes don't hold memory.
+"""
+
+import json
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+import enhanced_config
+from enhanced_config import BOT_TOKEN, TENANTS_FILE, TENANT_CACHE_SIZE
+from async_carts import AsyncCartManager
+from async_orders import AsyncOrderManager
+from cart_store import SQLiteCartStore
+from enhanced_cart_manager import BaseCartManager, CartManager
+from enhanced_order_manager import OrderManager
+from sqlite_order_manager import SQLiteOrderManager
+from expiry import ExpiringDict
+from group_cart import GroupCartManager
+from lru import LRUCache
+from menu_catalog import MenuCatalog, MenuSnapshot
+from redis_cart_manager import RedisCartManager
+from resp_client import get_client
+from screens import ScreenRegistry
+from sharding import check_shard_layout, holds_state, owns_user, shard_file
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+
+class TenantConfig:
+    """Config of one tenant: its overrides on top of enhanced_config"""
+
+    def __init__(self, overrides: Dict[str, Any]):
+        self._overrides = overrides
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._overrides[name]
+        except KeyError:
+            return getattr(enhanced_config, name)
+
+    def overrides(self, name: str) -> bool:
+        """Check whether the tenant sets a config key itself"""
+        return name in self._overrides
+
+
+def tenant_file(config: TenantConfig, name: str, key: str) -> str:
+    """Get a data file path of a tenant that nothing else writes to
+
+    The default tenant and tenants that set the key themselves use it as
+    is; other tenants get the default path with their key added.
+    """
+    path = getattr(config, name)
+    if key == DEFAULT_TENANT or config.overrides(name):
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{key}{extension}"
+
+
+def create_cart_manager(config: Any, key: str) -> BaseCartManager:
+    """Create the cart backend selected by a tenant's CART_BACKEND"""
+    if config.CART_BACKEND == "redis":
+        client = get_client(config.CART_REDIS_URL, config.CART_REDIS_POOL_SIZE)
+        return RedisCartManager(client, config.ORDER_TIMEOUT, prefix=f"cart:{key}:")
+    return CartManager(config.ORDER_TIMEOUT, SQLiteCartStore(config.CART_DB_FILE, key), owns=owns_user)
+
+
+def create_order_manager(config: TenantConfig, key: str):
+    """Create the order backend selected by a tenant's ORDER_BACKEND"""
+    if config.ORDER_BACKEND == "sqlite":
+        return SQLiteOrderManager(config.ORDERS_DB_FILE, key)
+    # Raises OrderLogLocked if two tenants resolve to the same log
+    return OrderManager(shard_file(tenant_file(config, "ORDERS_FILE", key)))
+
+
+class _TenantRuntime:
+    """The evictable, lazily loaded state of a tenant"""
+
+    def __init__(self, tenant: "Tenant", build_screens: Callable):
+        self.catalog = MenuCatalog(tenant.config.MENU_FILE)
+        self.screens = ScreenRegistry(tenant.config, build_screens)
+
+
+class Tenant:
+    """One cafe served by this process"""
+
+    def __init__(self, registry: "TenantRegistry", key: str, token: str, overrides: Dict[str, Any]):
+        self._registry = registry
+        self.key = key
+        self.token = token
+        self.config = TenantConfig(overrides)
+        if self.config.ORDER_BACKEND != "sqlite":
+            # Raises ShardLayoutError, in the router too, instead of hiding orders
+            check_shard_layout(tenant_file(self.config, "ORDERS_FILE", key))
+        # A shard router only needs the token; it handles no updates
+        self.has_state = holds_state()
+        if self.has_state:
+            self._open_state()
+
+    def _open_state(self) -> None:
+        """Open the carts, orders and conversation state of the tenant"""
+        key = self.key
+        # Carts, orders and conversation state are not evicted with the menu
+        self.cart_manager = create_cart_manager(self.config, key)
+        # Group carts live in this process whatever CART_BACKEND is, so
+        # they are written behind to the cart database under their own namespace
+        self.group_carts = GroupCartManager(
+            self.config.ORDER_TIMEOUT, SQLiteCartStore(self.config.CART_DB_FILE, f"{key}:tables"),
+            owns=owns_user
+        )
+        # What handlers use: the cart managers' calls, off the event loop if they block
+        self.carts = AsyncCartManager(self.cart_manager, self.config.CART_REDIS_POOL_SIZE,
+                                      self.config.CART_QUEUE_SIZE)
+        self.table_carts = AsyncCartManager(self.group_carts)
+        self.order_manager = create_order_manager(self.config, key)
+        # What handlers use: order_manager's calls, off the event loop
+        self.orders = AsyncOrderManager(self.order_manager)
+        # Abandoned conversations expire like abandoned carts
+        self.user_states = ExpiringDict(self.config.ORDER_TIMEOUT, name="user states")
+
+    def close(self) -> None:
+        """Write pending state to disk before the process exits"""
+        if self.has_state:
+            self.carts.close()
+            self.table_carts.close()
+            self.orders.close()
+
+    def menu(self) -> MenuSnapshot:
+        """Get the current menu snapshot of this tenant"""
+        return self._registry._runtime(self).catalog.get()
+
+    @property
+    def screens(self) -> ScreenRegistry:
+        """Get the prebuilt static screens of this tenant"""
+        return self._registry._runtime(self).screens
+
+
+class TenantRegistry:
+    """Resolves tenants by bot token and keeps their menus in an LRU"""
+
+    def __init__(self, build_screens: Callable, tenants_file: str = TENANTS_FILE,
+                 max_loaded: int = TENANT_CACHE_SIZE):
+        self._build_screens = build_screens
+        self._loaded = LRUCache(max_loaded, on_evict=self._on_evict)
+        self._lock = threading.Lock()
+        self._by_token: Dict[str, Tenant] = {}
+        self._by_key: Dict[str, Tenant] = {}
+        self._load_tenants(tenants_file)
+        if not self._by_key:
+            # Only built when no cafes are configured: a tenant opens its carts and orders
+            self._add(Tenant(self, DEFAULT_TENANT, BOT_TOKEN, {}))
+        # Serves updates that no bot token resolves
+        self.default = next(iter(self._by_key.values()))
+
+    def _add(self, tenant: Tenant) -> None:
+        self._by_token[tenant.token] = tenant
+        self._by_key[tenant.key] = tenant
+
+    def _load_tenants(self, tenants_file: str) -> None:
+        """Read tenant definitions from the tenants file, if any"""
+        try:
+            with open(tenants_file, 'r', encoding='utf-8') as f:
+                definitions = json.load(f)
+        except FileNotFoundError:
+            return
+        except json.JSONDecodeError as e:
+            logger.error(f"Error parsing tenants file {tenants_file}: {e}")
+            return
+
+        for key, definition in definitions.items():
+            if key == DEFAULT_TENANT:
+                logger.error(f"Tenant key {key} is reserved, skipping")
+                continue
+            token = definition.get("bot_token")
+            if not token:
+                logger.error(f"Tenant {key} has no bot_token, skipping")
+                continue
+            self._add(Tenant(self, key, token, definition.get("config", {})))
+        logger.info(f"Loaded {len(self._by_key)} tenants from {tenants_file}")
+
+    def _on_evict(self, key: str, runtime: _TenantRuntime) -> None:
+        logger.info(f"Evicted menu of tenant {key}")
+
+    def _runtime(self, tenant: Tenant) -> _TenantRuntime:
+        """Get the loaded state of a tenant, loading it on a miss"""
+        runtime = self._loaded.get(tenant.key)
+        if runtime is None:
+            with self._lock:
+                runtime = self._loaded.get(tenant.key)
+                if runtime is None:
+                    runtime = _TenantRuntime(tenant, self._build_screens)
+                    self._loaded.put(tenant.key, runtime)
+        return runtime
+
+    def tenants(self) -> List[Tenant]:
+        """Get every configured tenant, or just the default one"""
+        return list(self._by_key.values())
+
+    def for_token(self, token: Optional[str]) -> Tenant:
+        """Get the tenant of a bot token, falling back to the first tenant"""
+        return self._by_token.get(token, self.default)
+
+
+_current_tenant: ContextVar[Optional[Tenant]] = ContextVar("current_tenant", default=None)
+
+
+def bind_tenant(tenant: Tenant) -> None:
+    """Make a tenant current for the update being processed"""
+    _current_tenant.set(tenant)
+
+
+def current_tenant(registry: TenantRegistry) -> Tenant:
+    """Get the tenant bound to the current update, or the first tenant"""
+    return _current_tenant.get() or registry.default
@@ -0,0 +1,59 @@
+"""
+Tests of the shared group carts and their write-behind storage
+"""
+
+import pytest
+
+from cart_store import SQLiteCartStore
+from group_cart import GroupCartManager
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "carts.db")
+
+
+def test_member_deltas_add_up():
+    manager = GroupCartManager(60)
+    assert manager.add_item((-100, 1), "latte")
+    assert manager.add_item((-100, 2), "latte")
+    assert manager.add_item((-100, 2), "latte", -1)
+    assert not manager.add_item((-100, 2), "mocha", -1)
+    cart = manager.get_cart((-100, 3))
+    assert cart.to_dict() == {"latte": 1}
+    assert cart.lines["latte"].added == {1: 1, 2: 1}
+    assert cart.lines["latte"].removed == {2: 1}
+
+
+def test_carts_survive_restart(db_file):
+    manager = GroupCartManager(60, SQLiteCartStore(db_file, "cafe:tables"))
+    manager.add_item((-100, 1), "latte", 2)
+    manager.add_item((-100, 2), "latte", -1)
+    manager.add_item((-200, 1), "tea")
+    manager.clear_cart((-200, 1))
+    manager.close()
+
+    manager = GroupCartManager(60, SQLiteCartStore(db_file, "cafe:tables"))
+    try:
+        cart = manager.get_cart((-100, 1))
+        assert cart.to_dict() == {"latte": 1}
+        assert (len(cart), cart.count) == (1, 1)
+        assert cart.lines["latte"].added == {1: 2}
+        assert cart.lines["latte"].removed == {2: 1}
+        assert manager.get_cart((-200, 1)).to_dict() == {}
+    finally:
+        manager.close()
+
+
+def test_restore_skips_chats_of_other_shards(db_file):
+    manager = GroupCartManager(60, SQLiteCartStore(db_file, "cafe:tables"))
+    manager.add_item((-100, 1), "latte")
+    manager.add_item((-200, 1), "tea")
+    manager.close()
+
+    manager = GroupCartManager(60, SQLiteCartStore(db_file, "cafe:tables"), owns=lambda chat_id: chat_id == -200)
+    try:
+        assert manager.get_cart((-100, 1)).to_dict() == {}
+        assert manager.get_cart((-200, 1)).to_dict() == {"tea": 1}
+    finally:
+        manager.close()
@@ -0,0 +1,143 @@
+"""
+Tests of the append-only order log (OrderManager)
+"""
+
+import threading
+
+import pytest
+
+from enhanced_config import ORDER_STATUS
+from enhanced_order_manager import OrderLogLocked, OrderManager, decode_record
+
+
+def order_data(user_id=1):
+    return {'user_id': user_id, 'items': {'latte': 1}, 'total_cents': 450}
+
+
+@pytest.fixture
+def orders_file(tmp_path):
+    return str(tmp_path / "orders.jsonl")
+
+
+def open_manager(orders_file, **kwargs):
+    # No background compaction; tests call compact() themselves
+    return OrderManager(orders_file, compact_interval=3600, **kwargs)
+
+
+def read_records(orders_file):
+    with open(orders_file, 'rb') as f:
+        return [decode_record(line) for line in f]
+
+
+def test_orders_survive_reopening(orders_file):
+    manager = open_manager(orders_file)
+    order_id = manager.create_order(order_data())
+    assert manager.update_order_status(order_id, ORDER_STATUS['CONFIRMED'])
+    manager.close()
+
+    manager = open_manager(orders_file)
+    try:
+        assert manager.get_order(order_id)['status'] == ORDER_STATUS['CONFIRMED']
+    finally:
+        manager.close()
+
+
+def test_torn_tail_is_dropped(orders_file):
+    manager = open_manager(orders_file)
+    order_ids = [manager.create_order(order_data(user_id)) for user_id in range(3)]
+    manager.close()
+    with open(orders_file, 'rb') as f:
+        intact = f.read()
+    # A write interrupted halfway through its record
+    with open(orders_file, 'ab') as f:
+        f.write(b'0badc0de {"id": "torn')
+
+    manager = open_manager(orders_file)
+    try:
+        for order_id in order_ids:
+            assert manager.get_order(order_id)['id'] == order_id
+        with open(orders_file, 'rb') as f:
+            assert f.read() == intact
+        # Appends go right after the last intact record
+        new_id = manager.create_order(order_data())
+        assert [record['id'] for record in read_records(orders_file)] == order_ids + [new_id]
+    finally:
+        manager.close()
+
+
+def test_corrupt_record_mid_log_is_skipped(orders_file):
+    manager = open_manager(orders_file)
+    first = manager.create_order(order_data(1))
+    second = manager.create_order(order_data(2))
+    manager.close()
+    with open(orders_file, 'rb') as f:
+        lines = f.readlines()
+    with open(orders_file, 'wb') as f:
+        f.write(lines[0].replace(b'"user_id": 1', b'"user_id": 7'))
+        f.write(lines[1])
+
+    manager = open_manager(orders_file)
+    try:
+        assert manager.get_order(first) is None
+        assert manager.get_order(second)['user_id'] == 2
+    finally:
+        manager.close()
+
+
+def test_compaction_keeps_latest_records(orders_file):
+    manager = open_manager(orders_file)
+    try:
+        order_ids = [manager.create_order(order_data(user_id)) for user_id in range(3)]
+        for status in ('CONFIRMED', 'PREPARING', 'READY'):
+            manager.update_order_status(order_ids[0], ORDER_STATUS[status])
+
+        assert manager.compact() == 3
+        assert len(read_records(orders_file)) == 3
+        assert manager.get_order(order_ids[0])['status'] == ORDER_STATUS['READY']
+        assert manager.get_order(order_ids[2])['user_id'] == 2
+
+        # The compacted log is appended to and read like the old one
+        manager.update_order_status(order_ids[1], ORDER_STATUS['CANCELLED'])
+        assert manager.get_order(order_ids[1])['status'] == ORDER_STATUS['CANCELLED']
+    finally:
+        manager.close()
+
+    manager = open_manager(orders_file)
+    try:
+        assert manager.get_order(order_ids[0])['status'] == ORDER_STATUS['READY']
+        assert manager.get_order(order_ids[1])['status'] == ORDER_STATUS['CANCELLED']
+    finally:
+        manager.close()
+
+
+def test_concurrent_writers_share_fsyncs(orders_file):
+    manager = open_manager(orders_file, commit_window=0.02)
+    writers = 16
+    start = threading.Barrier(writers)
+    order_ids = []
+
+    def write():
+        start.wait()
+        order_ids.append(manager.create_order(order_data()))
+
+    try:
+        threads = [threading.Thread(target=write) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(order_ids)) == writers and None not in order_ids
+        assert manager.fsyncs < writers
+        assert {record['id'] for record in read_records(orders_file)} == set(order_ids)
+    finally:
+        manager.close()
+
+
+def test_second_manager_of_a_log_is_refused(orders_file):
+    manager = open_manager(orders_file)
+    try:
+        with pytest.raises(OrderLogLocked):
+            open_manager(orders_file)
+    finally:
+        manager.close()
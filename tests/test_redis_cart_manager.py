@@ -0,0 +1,96 @@
+"""
+Tests of RedisCartManager against the in-process stand-in server
+"""
+
+import time
+
+import pytest
+
+from enhanced_config import MAX_CART_ITEMS
+from redis_cart_manager import RedisCartManager
+from resp_client import get_client
+from resp_server import LocalRedisServer
+
+
+@pytest.fixture
+def server():
+    with LocalRedisServer() as server:
+        yield server
+
+
+@pytest.fixture
+def manager(server):
+    manager = RedisCartManager(get_client(server.url, 2), ttl=60)
+    yield manager
+    manager.close()
+
+
+def test_add_item_increments(manager):
+    assert manager.add_item(1, "latte")
+    assert manager.add_item(1, "latte", 2)
+    assert manager.get_item_quantity(1, "latte") == 3
+    assert manager.get_cart(1).to_dict() == {"latte": 3}
+
+
+def test_negative_add_item_removes_emptied_line(manager, server):
+    manager.add_item(1, "latte", 2)
+    assert manager.add_item(1, "latte", -1)
+    assert manager.get_item_quantity(1, "latte") == 1
+    assert manager.add_item(1, "latte", -1)
+    assert manager.get_item_quantity(1, "latte") == 0
+    assert b"cart:1" not in server.store.hashes
+
+
+def test_negative_add_item_of_missing_line_changes_nothing(manager, server):
+    assert not manager.add_item(1, "latte", -1)
+    assert manager.get_cart(1).to_dict() == {}
+    assert b"cart:1" not in server.store.hashes
+
+
+def test_update_quantity(manager):
+    manager.add_item(1, "latte")
+    assert manager.update_quantity(1, "latte", 5)
+    assert manager.get_item_quantity(1, "latte") == 5
+    assert manager.update_quantity(1, "latte", 0)
+    assert manager.get_item_quantity(1, "latte") == 0
+    assert not manager.remove_item(1, "latte")
+
+
+def test_cart_limit(manager):
+    for number in range(MAX_CART_ITEMS):
+        assert manager.add_item(1, f"item{number}")
+    assert not manager.add_item(1, "one_too_many")
+    assert not manager.update_quantity(1, "one_too_many", 2)
+    assert len(manager.get_cart(1)) == MAX_CART_ITEMS
+    # Lines already in the cart can still change
+    assert manager.add_item(1, "item0")
+    assert manager.get_item_quantity(1, "item0") == 2
+
+
+def test_carts_expire(server):
+    manager = RedisCartManager(get_client(server.url, 2), ttl=1)
+    try:
+        manager.add_item(1, "latte")
+        assert server.store.ttl(b"cart:1") == 1
+        time.sleep(1.1)
+        assert manager.get_cart(1).to_dict() == {}
+    finally:
+        manager.close()
+
+
+def test_writes_restart_expiry(manager, server):
+    manager.add_item(1, "latte")
+    server.store.deadlines[b"cart:1"] = time.monotonic() + 5
+    manager.add_item(1, "mocha")
+    assert server.store.ttl(b"cart:1") == 60
+
+
+def test_carts_of_users_are_separate(manager):
+    manager.add_item(1, "latte")
+    manager.add_item(2, "mocha")
+    first, second = manager.get_carts([1, 2])
+    assert first.to_dict() == {"latte": 1}
+    assert second.to_dict() == {"mocha": 1}
+    assert manager.clear_cart(1)
+    assert manager.get_cart(1).to_dict() == {}
+    assert manager.get_cart(2).to_dict() == {"mocha": 1}
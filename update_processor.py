@@ -0,0 +1,86 @@
+"""
+Concurrent update processing for the Enhanced Telegram Cafe Bot
+Different users' updates run in parallel, while each user's own updates run
+one at a time and in order, so cart and conversation state changes of one
+user never interleave
+"""
+
+import logging
+from collections import deque
+from typing import Any, Awaitable, Deque, Dict, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Serializes updates per user and runs different users concurrently
+
+    The first update of an idle user runs at once and then drains the
+    updates the user sent meanwhile, in order. Those wait in the user's
+    queue without holding one of the ``max_concurrent_updates`` slots, so
+    a user hammering buttons during a slow handler takes one slot, not one
+    per tap. A user's queue exists only while it has updates, so idle users
+    cost no memory and no cleanup sweep is needed. Updates without a user
+    or chat (e.g. polls) are not serialized.
+    """
+
+    __slots__ = ('_queues',)
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._queues: Dict[Hashable, Deque[Awaitable[Any]]] = {}
+
+    @staticmethod
+    def _key(update: object) -> Optional[Hashable]:
+        if not isinstance(update, Update):
+            return None
+        if update.effective_user is not None:
+            return update.effective_user.id
+        if update.effective_chat is not None:
+            return ("chat", update.effective_chat.id)
+        return None
+
+    @property
+    def active_users(self) -> int:
+        """Number of users with updates running or waiting"""
+        return len(self._queues)
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self._key(update)
+        if key is None:
+            await coroutine
+            return
+
+        # Runs on the event loop thread with no await in between, so
+        # creating, filling and dropping queues needs no locking
+        queue = self._queues.get(key)
+        if queue is not None:
+            # The user's running update will run this one; give back the slot
+            queue.append(coroutine)
+            return
+
+        queue = self._queues[key] = deque()
+        try:
+            while True:
+                try:
+                    await coroutine
+                except Exception as e:
+                    # Don't let one failed update drop the user's queued ones
+                    logger.error(f"Error processing update of {key}: {e}")
+                if not queue:
+                    break
+                coroutine = queue.popleft()
+        finally:
+            del self._queues[key]
+            # Only left over if the drain was cancelled
+            for waiting in queue:
+                waiting.close()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
@@ -2,32 +2,32 @@
 Utility functions for the Enhanced Telegram Cafe Bot
 """
 
-import json
 import logging
 from typing import Dict, List, Any
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+from config import CATEGORY_PAGE_SIZE
+from menu_catalog import get_catalog
+
 logger = logging.getLogger(__name__)
 
+MENU_FILE = 'menu_data.json'
+
 def load_menu_data() -> Dict[str, Any]:
-    """Load menu data from JSON file"""
-    try:
-        with open('menu_data.json', 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        logger.error("Menu data file not found")
-        return {"categories": {}}
-    except json.JSONDecodeError as e:
-        logger.error(f"Error parsing menu data: {e}")
-        return {"categories": {}}
+    """Get the current menu data from the shared catalog"""
+    return get_catalog(MENU_FILE).get().data
 
 def create_main_menu_keyboard() -> InlineKeyboardMarkup:
     """Create the main menu keyboard with category buttons"""
-    menu_data = load_menu_data()
+    menu = get_catalog(MENU_FILE).get()
+    return menu.cached("utils.main_menu", lambda: _build_main_menu_keyboard(menu))
+
+def _build_main_menu_keyboard(menu) -> InlineKeyboardMarkup:
+    """Build the main menu keyboard for one menu version"""
     keyboard = []
     
     # Add category buttons
-    for category_key, category_data in menu_data.get("categories", {}).items():
+    for category_key, category_data in menu.categories.items():
         keyboard.append([
             InlineKeyboardButton(
                 category_data["name"], 
@@ -44,13 +44,33 @@ def create_main_menu_keyboard() -> InlineKeyboardMarkup:
     
     return InlineKeyboardMarkup(keyboard)
 
-def create_category_keyboard(category: str) -> InlineKeyboardMarkup:
-    """Create keyboard for a specific menu category"""
-    menu_data = load_menu_data()
+def create_category_keyboard(category: str, page: int = 0) -> InlineKeyboardMarkup:
+    """Create keyboard for one page of a menu category"""
+    menu = get_catalog(MENU_FILE).get()
+    if category not in menu.categories:
+        # Don't let unknown callback data grow the cache
+        return _build_category_keyboard(menu, category, page)
+    _, page, _ = menu.category_page(category, page, CATEGORY_PAGE_SIZE)
+    return menu.cached(
+        ("utils.category", category, page),
+        lambda: _build_category_keyboard(menu, category, page)
+    )
+
+def create_page_buttons(category: str, page: int, page_count: int) -> List[InlineKeyboardButton]:
+    """Create the previous/next row of a paginated category"""
+    row = []
+    if page > 0:
+        row.append(InlineKeyboardButton("◀️ Prev", callback_data=f"catpage_{page - 1}_{category}"))
+    row.append(InlineKeyboardButton(f"{page + 1}/{page_count}", callback_data="noop"))
+    if page < page_count - 1:
+        row.append(InlineKeyboardButton("Next ▶️", callback_data=f"catpage_{page + 1}_{category}"))
+    return row
+
+def _build_category_keyboard(menu, category: str, page: int) -> InlineKeyboardMarkup:
+    """Build the keyboard of one category page for one menu version"""
     keyboard = []
     
-    category_data = menu_data.get("categories", {}).get(category, {})
-    items = category_data.get("items", [])
+    items, page, page_count = menu.category_page(category, page, CATEGORY_PAGE_SIZE)
     
     # Add item buttons (2 per row for better mobile experience)
     for i in range(0, len(items), 2):
@@ -64,6 +84,9 @@ def create_category_keyboard(category: str) -> InlineKeyboardMarkup:
                 ))
         keyboard.append(row)
     
+    if page_count > 1:
+        keyboard.append(create_page_buttons(category, page, page_count))
+    
     # Add navigation buttons
     keyboard.extend([
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="main_menu")],
@@ -111,25 +134,11 @@ Choose an item below to see details! 👇
 
 def get_item_by_id(item_id: str) -> Dict[str, Any]:
     """Get a menu item by its ID"""
-    menu_data = load_menu_data()
-    
-    for category_data in menu_data.get("categories", {}).values():
-        for item in category_data.get("items", []):
-            if item.get("id") == item_id:
-                return item
-    
-    return {}
+    return get_catalog(MENU_FILE).get().get_item(item_id) or {}
 
 def get_category_by_item_id(item_id: str) -> str:
     """Get the category key for a given item ID"""
-    menu_data = load_menu_data()
-    
-    for category_key, category_data in menu_data.get("categories", {}).items():
-        for item in category_data.get("items", []):
-            if item.get("id") == item_id:
-                return category_key
-    
-    return ""
+    return get_catalog(MENU_FILE).get().get_category_key(item_id)
 
 def create_order_keyboard() -> InlineKeyboardMarkup:
     """Create keyboard for order information"""